@@ -1,30 +1,50 @@
 import tkinter as tk
 from tkinter import messagebox
 import socket
+import random
+import queue
+import score_protocol
+from reliable_delivery import DeliveryWorker
 
 # Default values - can be changed in the GUI
 DEFAULT_PI_IP = "192.168.1.100" # <--- CHANGE THIS TO YOUR RASPBERRY PI'S ACTUAL IP ADDRESS
+# Several displays: list their IPs separated by commas, or enter a multicast group (e.g. "239.255.42.99",
+# matching UDP_MULTICAST_GROUP in test.py) to reach every display with a single send. Add the state
+# service as "host:12347" (see score_service.py) so rebooted displays can catch up from it.
 DEFAULT_UDP_PORT = 12345
-TEAM_NAMES_ORDER = ["castile", "capet", "essex", "milan"] # Order for packet construction
+MULTICAST_TTL = 1 # Hops multicast packets may cross; 1 keeps them on the local network
+MULTICAST_INTERFACE = None # Local IP to send multicast from, or None for the system default
+DELIVERY_POLL_MS = 100 # How often the status bar picks up ACK results in reliable mode
+TEAM_NAMES_ORDER = ["castile", "capet", "essex", "milan"] # Order for packet construction; any number of teams, matching the display
+DEFAULT_CHANNEL = 0 # Board on the display (CHANNELS in test.py); 0 is the house points. Other boards need their teams in TEAM_NAMES_ORDER
 
 class UDPSenderApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Score Sender")
-        self.root.geometry("350x300") # Adjusted size for better fit
+        self.root.geometry(f"350x{240 + 40 * len(TEAM_NAMES_ORDER)}") # One 40px row per team entry
 
         # --- Variables ---
         self.ip_var = tk.StringVar(value=DEFAULT_PI_IP)
         self.port_var = tk.StringVar(value=str(DEFAULT_UDP_PORT))
+        self.channel_var = tk.StringVar(value=str(DEFAULT_CHANNEL))
         self.status_var = tk.StringVar(value="Enter scores and IP/Port.")
 
+        self.legacy_format_var = tk.BooleanVar(value=False) # Text packets for displays older than the binary protocol
+        self.reliable_var = tk.BooleanVar(value=False) # Wait for each display's ACK and retransmit until it arrives
+        self.sender_id = random.getrandbits(32) # Lets displays tell our sequence numbers apart from other senders'
+        self.sequence = 0
+        self.sock = self.open_socket() # Reused for every send
+        self.delivery_worker = DeliveryWorker(self.sock, self.sender_id) # Handles ACKs and retransmits off the Tk thread
+        self.delivery_status = {} # target -> latest delivery result text, shown in the status bar
+
         self.score_entries = {} # To store Entry widgets for scores
         self.score_vars = {}    # To store StringVars for scores
 
         # --- UI Elements ---
         # IP Address
         tk.Label(root, text="Target IP:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        ip_entry = tk.Entry(root, textvariable=self.ip_var, width=20)
+        ip_entry = tk.Entry(root, textvariable=self.ip_var, width=30)
         ip_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
         # Port
@@ -32,8 +52,13 @@ class UDPSenderApp:
         port_entry = tk.Entry(root, textvariable=self.port_var, width=10)
         port_entry.grid(row=1, column=1, padx=5, pady=5, sticky="w") # sticky w for port
 
+        # Channel
+        tk.Label(root, text="Channel:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        channel_entry = tk.Entry(root, textvariable=self.channel_var, width=10)
+        channel_entry.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
         # Score Entries
-        current_row = 2
+        current_row = 3
         for team_name in TEAM_NAMES_ORDER:
             tk.Label(root, text=f"{team_name.capitalize()}:").grid(row=current_row, column=0, padx=5, pady=5, sticky="w")
             score_var = tk.StringVar(value="0") # Default score to 0
@@ -44,59 +69,207 @@ class UDPSenderApp:
             self.score_entries[team_name] = score_entry # Not strictly needed but good to have
             current_row += 1
 
-        # Send Button
-        send_button = tk.Button(root, text="Send Scores", command=self.send_scores)
-        send_button.grid(row=current_row, column=0, columnspan=2, padx=5, pady=10)
+        tk.Checkbutton(root, text="Legacy text format", variable=self.legacy_format_var).grid(row=current_row, column=0, columnspan=2, padx=5, sticky="w")
+        current_row += 1
+        tk.Checkbutton(root, text="Reliable delivery (wait for ACK)", variable=self.reliable_var).grid(row=current_row, column=0, columnspan=2, padx=5, sticky="w")
+        current_row += 1
+
+        # Send Buttons: "Send Scores" sets every team's total, "Add Points" adds the entered amounts to the
+        # display's current totals, so two people entering merits at once don't overwrite each other.
+        button_frame = tk.Frame(root)
+        button_frame.grid(row=current_row, column=0, columnspan=2, padx=5, pady=10)
+        send_button = tk.Button(button_frame, text="Send Scores", command=self.send_scores)
+        send_button.pack(side=tk.LEFT, padx=5)
+        add_button = tk.Button(button_frame, text="Add Points", command=self.add_points)
+        add_button.pack(side=tk.LEFT, padx=5)
 
         # Status Label
-        status_label = tk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor="w")
+        status_label = tk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor="w", justify=tk.LEFT, wraplength=330)
         status_label.grid(row=current_row + 1, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
 
         # Configure column weights for resizing if window were resizable
         root.grid_columnconfigure(1, weight=1)
+        root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(DELIVERY_POLL_MS, self.poll_delivery_results)
+
+    def open_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("", 0)) # Bound up front so displays' ACKs have somewhere to arrive
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL)
+        if MULTICAST_INTERFACE:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(MULTICAST_INTERFACE))
+        return sock
+
+    def on_closing(self):
+        self.delivery_worker.close()
+        self.sock.close()
+        self.root.destroy()
 
 
     def send_scores(self):
-        target_ip = self.ip_var.get()
-        try:
-            target_port = int(self.port_var.get())
-            if not (0 < target_port < 65536):
-                raise ValueError("Port must be between 1 and 65535")
-        except ValueError as e:
-            messagebox.showerror("Invalid Port", f"Error: {e}")
-            self.status_var.set(f"Error: Invalid port - {e}")
-            return
+        targets = self.read_targets()
+        if targets is None: return
+        channel = self.read_channel()
+        if channel is None: return
 
         scores_list = []
         try:
             for team_name in TEAM_NAMES_ORDER:
                 score_str = self.score_vars[team_name].get()
                 score_val = int(score_str) # Ensure it's an integer
-                scores_list.append(str(score_val)) # Keep as string for join
+                scores_list.append(score_val)
             
-            # Construct message in the format: {castile}:{capet}:{essex}:{milan}
-            # The order is determined by TEAM_NAMES_ORDER
-            message_str = ":".join(scores_list)
-            message_bytes = message_str.encode('utf-8')
-
-            # Send UDP packet
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(message_bytes, (target_ip, target_port))
-            sock.close()
-
-            self.status_var.set(f"Sent: {message_str} to {target_ip}:{target_port}")
-            print(f"Sent: {message_str} to {target_ip}:{target_port}")
+            # The order of the scores is determined by TEAM_NAMES_ORDER
+            message_str = ":".join(str(score) for score in scores_list)
+            if self.legacy_format_var.get():
+                if self.reliable_var.get() or channel:
+                    messagebox.showerror("Send Scores", "Error: Reliable delivery and channels other than 0 need the binary format (untick Legacy text format).")
+                    return
+                # Text format: one score per team in TEAM_NAMES_ORDER, e.g. {castile}:{capet}:{essex}:{milan}
+                frames = [(None, score_protocol.encode_text_scores(scores_list))]
+            else:
+                frames = [(self.next_sequence(), score_protocol.encode_full_state(self.sender_id, self.sequence, scores_list, self.reliable_var.get(), channel=channel))]
+                message_str += f" (seq {self.sequence})"
 
+            self.transmit(frames, message_str, targets)
+        except score_protocol.ProtocolError as e:
+            messagebox.showerror("Invalid Score", f"Error: {e}")
+            self.status_var.set(f"Error: {e}")
         except ValueError:
             messagebox.showerror("Invalid Score", "Error: Scores must be integers.")
             self.status_var.set("Error: Scores must be integers.")
         except socket.gaierror: # For IP address resolution errors
-            messagebox.showerror("Invalid IP", f"Error: Could not resolve IP address '{target_ip}'.")
-            self.status_var.set(f"Error: Invalid IP '{target_ip}'.")
+            messagebox.showerror("Invalid IP", f"Error: Could not resolve IP address in '{self.ip_var.get()}'.")
+            self.status_var.set(f"Error: Invalid IP in '{self.ip_var.get()}'.")
+        except Exception as e:
+            messagebox.showerror("Send Error", f"An error occurred: {e}")
+            self.status_var.set(f"Error: {e}")
+
+    def add_points(self):
+        # Sends the non-zero entries as increments, batched MAX_DELTAS per datagram, then clears them so a
+        # second click doesn't add the same merits twice.
+        targets = self.read_targets()
+        if targets is None: return
+        if self.legacy_format_var.get():
+            messagebox.showerror("Add Points", "Error: Adding points needs the binary format (untick Legacy text format).")
+            return
+        channel = self.read_channel()
+        if channel is None: return
+
+        try:
+            deltas = []
+            for team_index, team_name in enumerate(TEAM_NAMES_ORDER):
+                increment = int(self.score_vars[team_name].get() or 0)
+                if increment: deltas.append((team_index, increment))
+            if not deltas:
+                self.status_var.set("Nothing to add: all entries are 0.")
+                return
+            frames = score_protocol.encode_delta_frames(self.sender_id, self.sequence + 1, deltas, self.reliable_var.get(), channel)
+            self.sequence = frames[-1][0]
+            message_str = ", ".join(f"{TEAM_NAMES_ORDER[team_index].capitalize()} {increment:+d}" for team_index, increment in deltas)
+            self.transmit(frames, f"{message_str} (seq {self.sequence})", targets)
+            for team_name in TEAM_NAMES_ORDER: self.score_vars[team_name].set("0")
+        except score_protocol.ProtocolError as e:
+            messagebox.showerror("Invalid Score", f"Error: {e}")
+            self.status_var.set(f"Error: {e}")
+        except ValueError:
+            messagebox.showerror("Invalid Score", "Error: Points must be integers.")
+            self.status_var.set("Error: Points must be integers.")
+        except socket.gaierror: # For IP address resolution errors
+            messagebox.showerror("Invalid IP", f"Error: Could not resolve IP address in '{self.ip_var.get()}'.")
+            self.status_var.set(f"Error: Invalid IP in '{self.ip_var.get()}'.")
         except Exception as e:
             messagebox.showerror("Send Error", f"An error occurred: {e}")
             self.status_var.set(f"Error: {e}")
 
+    def read_targets(self):
+        # [(host, port), ...] from the entry fields, or None after reporting a problem. A target written as
+        # "host:port" (e.g. a score_service.py instance) overrides the Target Port field.
+        target_ips = self.ip_var.get().replace(",", " ").split()
+        if not target_ips:
+            messagebox.showerror("Invalid IP", "Error: Enter at least one target IP or multicast group.")
+            self.status_var.set("Error: No target IP.")
+            return None
+        try:
+            target_port = int(self.port_var.get())
+            if not (0 < target_port < 65536):
+                raise ValueError("Port must be between 1 and 65535")
+        except ValueError as e:
+            messagebox.showerror("Invalid Port", f"Error: {e}")
+            self.status_var.set(f"Error: Invalid port - {e}")
+            return None
+        targets = []
+        for target_ip in target_ips:
+            host, _, port_str = target_ip.partition(":")
+            try:
+                port = int(port_str) if port_str else target_port
+                if not (0 < port < 65536): raise ValueError
+            except ValueError:
+                messagebox.showerror("Invalid Port", f"Error: Invalid port in target '{target_ip}'.")
+                self.status_var.set(f"Error: Invalid port in '{target_ip}'.")
+                return None
+            targets.append((host, port))
+        return targets
+
+    def read_channel(self):
+        # Channel number from the entry field, or None after reporting a problem. One sequence counter is
+        # shared by all channels, so displays can still spot missed frames per sender.
+        try:
+            channel = int(self.channel_var.get())
+            if not (0 <= channel < score_protocol.MAX_CHANNELS): raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid Channel", f"Error: Channel must be between 0 and {score_protocol.MAX_CHANNELS - 1}.")
+            self.status_var.set("Error: Invalid channel.")
+            return None
+        return channel
+
+    def next_sequence(self):
+        self.sequence = (self.sequence + 1) & score_protocol.SEQUENCE_MASK
+        return self.sequence
+
+    def transmit(self, frames, message_str, targets):
+        # frames: (sequence, packet) pairs. In reliable mode the delivery worker sends them and the status bar
+        # is filled in from its results; otherwise they go out here, to every target on the shared socket.
+        if self.reliable_var.get():
+            sequences = [sequence for sequence, _ in frames]
+            label = f"seq {sequences[0]}" if len(sequences) == 1 else f"seq {sequences[0]}-{sequences[-1]}"
+            self.delivery_worker.submit(frames, targets, label)
+            self.delivery_status = {f"{host}:{port}": f"{label}: waiting for ACK" for host, port in targets}
+            self.show_delivery_status()
+            print(f"Sending: {message_str} to {', '.join(self.delivery_status)} (reliable)")
+            return
+        # One unreachable display doesn't stop the others; the send only fails as a whole if no target could be reached.
+        packets = [packet for _, packet in frames]
+        failed = {}
+        for host, port in targets:
+            try:
+                for message_bytes in packets: self.sock.sendto(message_bytes, (host, port))
+            except OSError as e:
+                failed[f"{host}:{port}"] = e
+        if len(failed) == len(targets): raise next(iter(failed.values()))
+        targets_str = ", ".join(f"{host}:{port}" for host, port in targets)
+        status = f"Sent: {message_str} to {targets_str}"
+        if failed: status += f" ({len(failed)} failed: {', '.join(f'{ip} - {e}' for ip, e in failed.items())})"
+        self.status_var.set(status)
+        print(status)
+
+    def poll_delivery_results(self):
+        updated = False
+        while True:
+            try:
+                target, delivered, detail = self.delivery_worker.results.get_nowait()
+            except queue.Empty:
+                break
+            self.delivery_status[target] = detail
+            print(f"{target}: {detail}")
+            updated = True
+        if updated: self.show_delivery_status()
+        self.root.after(DELIVERY_POLL_MS, self.poll_delivery_results)
+
+    def show_delivery_status(self):
+        self.status_var.set("\n".join(f"{target}: {detail}" for target, detail in self.delivery_status.items()))
+
 
 if __name__ == "__main__":
     sender_root = tk.Tk()
@@ -0,0 +1,270 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import tkinter as tk
+
+import image_cache
+import tk_stub
+from load_generator import LoadGenerator
+from capture_replay import CaptureReplayer
+
+# --- Scoreboard display benchmark ---
+# Runs the real ScoreboardApp (test.py) against a local load generator and reports, as JSON:
+# packets/s accepted, network and rejected drops, update_display latency percentiles, packet-to-render
+# latency percentiles (send -> update_display returned), RSS over the run, per-timer scheduler stats,
+# scheduler wakeups per second and the display's time to first frame.
+# Needs an X display; on a headless machine run it under Xvfb, e.g. `xvfb-run python benchmark.py`
+# or `python benchmark.py --xvfb`, or pass --stub-tk to measure everything but Tk's drawing without one
+# (see tk_stub.py). The display is configured with --teams teams, matching the generated frames.
+# Results go to stdout (or --output) and the display's own messages to stderr, so `python benchmark.py | jq` works.
+#
+#   python benchmark.py --rate 500 --duration 20 --output results.json
+#   python benchmark.py --stub-tk --teams 11 --rate 1000
+#   python benchmark.py --pattern burst --burst-size 200 --duration 600 --baseline results.json   # soak + regression check
+#   python benchmark.py --replay assembly.hpcap --replay-speed 10 --baseline before.json   # a recorded incident, before/after a change
+# Replayed captures carry no send-time marker, so packet_to_render_ms is only reported for synthetic load.
+
+BENCHMARK_PORT = 12346
+RSS_SAMPLE_INTERVAL_MS = 1000
+WARMUP_MS = 500
+DRAIN_MS = 1000 # Time allowed after the generator stops for queued packets to be rendered
+REGRESSION_TOLERANCE = 0.2 # Fractional slowdown of a latency percentile (or drop in accepted rate) reported as a regression
+LATENCY_RESERVOIR_SIZE = 10000 # Samples kept per latency metric for the percentiles
+
+
+class LatencySamples:
+    # Count, mean and max over every sample; percentiles from a uniform reservoir sample of at most `size`,
+    # so the harness's own memory (measured along with the display's) doesn't grow during soak runs.
+    def __init__(self, size=LATENCY_RESERVOIR_SIZE):
+        self.size = size
+        self.reservoir = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.random = random.Random(0)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if len(self.reservoir) < self.size:
+            self.reservoir.append(value)
+        else:
+            index = self.random.randrange(self.count)
+            if index < self.size: self.reservoir[index] = value
+
+
+def percentiles(samples):
+    if not samples.count: return {"count": 0}
+    ordered = sorted(samples.reservoir)
+    def pick(fraction): return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {"count": samples.count, "mean": samples.total / samples.count, "p50": pick(0.50),
+            "p90": pick(0.90), "p99": pick(0.99), "max": samples.max}
+
+
+def current_rss_kb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource # Fallback reports peak rather than current RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def start_xvfb(display=":99"):
+    if not shutil.which("Xvfb"): sys.exit("ERROR: --xvfb given but Xvfb is not installed")
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(1.0)
+    return process
+
+
+def configure_display_module(board, port, teams, stub_tk=False):
+    # Listen on loopback only, load the images that ship with the repo and show one board of `teams` teams
+    # (the four houses, or team1..teamN for other counts).
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    team_names = board.TEAM_NAMES_ORDERED_IN_PACKET if teams == len(board.TEAM_NAMES_ORDERED_IN_PACKET) else [f"team{index + 1}" for index in range(teams)]
+    board.TEAM_NAMES_ORDERED_IN_PACKET = team_names
+    board.CHANNELS = {0: {"title": "Benchmark", "teams": team_names, "initial_points": board.INITIAL_POINTS}}
+    board.HOUSE_POINTS_CHANNEL = 0
+    board.UDP_LISTEN_ADDRESSES = [("127.0.0.1", port)]
+    board.UDP_MULTICAST_GROUP = None
+    board.IMAGE_BASE_PATH = repo_dir
+    board.TROPHY_ICON_PATH = os.path.join(repo_dir, "trophy.png")
+    board.LOGO_FOR_SCREENSAVER_PATH = os.path.join(repo_dir, "logo.png")
+    board.STATE_DIR = tempfile.mkdtemp(prefix="scoreboard-benchmark-") # Don't touch the real persisted scores
+    board.METRICS_ENABLED = False
+    board.CAPTURE_ENABLED = False
+    if stub_tk:
+        board.tk = image_cache.tk = tk_stub
+        board.IMAGE_DISK_CACHE_ENABLED = False # Stub images have no pixels to write
+
+
+class BenchmarkRun:
+    def __init__(self, app, generator, first_team):
+        self.app = app
+        self.generator = generator
+        self.first_team = first_team # Its score carries the sequence number of the packet being rendered
+        self.received = 0
+        self.render_ms = LatencySamples()
+        self.packet_to_render_ms = LatencySamples()
+        self.rss_samples_kb = [current_rss_kb()]
+        self.started = time.monotonic()
+        self.instrument()
+
+    def instrument(self):
+        handle_datagram = self.app.handle_datagram
+        update_display = self.app.update_display
+
+        def counted_handle_datagram(data, addr, sock=None):
+            self.received += 1
+            return handle_datagram(data, addr, sock)
+
+        def timed_update_display(redraw_all=False):
+            render_start = time.perf_counter()
+            update_display(redraw_all)
+            self.render_ms.add((time.perf_counter() - render_start) * 1000)
+            # Frames older than the one on screen were coalesced, dropped or lost, so their send times are discarded.
+            rendered_sequence = self.app.team_points.get(self.first_team)
+            send_times = self.generator.send_times
+            if rendered_sequence is None: return
+            while send_times and send_times[0][0] < rendered_sequence: send_times.popleft()
+            if send_times and send_times[0][0] == rendered_sequence:
+                self.packet_to_render_ms.add((time.monotonic() - send_times.popleft()[1]) * 1000)
+
+        self.app.handle_datagram = counted_handle_datagram
+        self.app.update_display = timed_update_display
+
+    def sample_rss(self):
+        self.rss_samples_kb.append(current_rss_kb())
+
+    def results(self, config, elapsed_s):
+        # Accepted means applied to the board: frames queued by the listener can still be rejected when they
+        # are processed (e.g. the wrong number of teams), which the display's own counter reflects.
+        rss = self.rss_samples_kb
+        accepted = self.app.metric_packets_accepted.value
+        return {
+            "config": config,
+            "elapsed_s": elapsed_s,
+            "packets_sent": self.generator.sent,
+            "packets_received": self.received,
+            "packets_accepted": accepted,
+            "accepted_per_s": accepted / max(elapsed_s, 1e-9),
+            "drops_network": max(0, self.generator.sent - self.received),
+            "drops_rejected": self.received - accepted,
+            "renders": self.render_ms.count,
+            "update_display_ms": percentiles(self.render_ms),
+            "packet_to_render_ms": percentiles(self.packet_to_render_ms),
+            "rss_kb": {"start": rss[0], "end": rss[-1], "max": max(rss), "growth": rss[-1] - rss[0]},
+            "scheduler": self.app.scheduler.stats(),
+            "scheduler_wakeups_per_s": self.app.scheduler.wakeups / max(time.monotonic() - self.started, 1e-9), # Idle cost of the timers
+            "time_to_first_frame_ms": self.app.time_to_first_frame_s * 1000 if self.app.time_to_first_frame_s is not None else None,
+        }
+
+
+def find_regressions(results, baseline):
+    regressions = []
+    for metric in ("update_display_ms", "packet_to_render_ms"):
+        for stat in ("p50", "p99"):
+            old, new = baseline.get(metric, {}).get(stat), results[metric].get(stat)
+            if old and new and new > old * (1 + REGRESSION_TOLERANCE):
+                regressions.append(f"{metric}.{stat}: {old:.2f} -> {new:.2f} ms")
+    old_startup, new_startup = baseline.get("time_to_first_frame_ms"), results.get("time_to_first_frame_ms")
+    if old_startup and new_startup and new_startup > old_startup * (1 + REGRESSION_TOLERANCE):
+        regressions.append(f"time_to_first_frame_ms: {old_startup:.0f} -> {new_startup:.0f} ms")
+    old_rate = baseline.get("accepted_per_s")
+    if old_rate and results["accepted_per_s"] < old_rate * (1 - REGRESSION_TOLERANCE):
+        regressions.append(f"accepted_per_s: {old_rate:.0f} -> {results['accepted_per_s']:.0f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scoreboard display under synthetic UDP load.")
+    parser.add_argument("--port", type=int, default=BENCHMARK_PORT)
+    parser.add_argument("--rate", type=float, default=200.0, help="packets per second (steady pattern)")
+    parser.add_argument("--teams", type=int, default=4, help="teams on the display and in each frame (match the capture with --replay)")
+    parser.add_argument("--pattern", choices=["steady", "burst"], default="steady")
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--burst-interval-ms", type=int, default=1000)
+    parser.add_argument("--format", dest="packet_format", choices=["binary", "text"], default="binary")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load (use minutes-hours for soak runs)")
+    parser.add_argument("--replay", help="drive the display from this packet capture instead of synthetic load")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="capture time scale; 0 sends back to back")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run; exit 1 if this run regressed")
+    parser.add_argument("--xvfb", action="store_true", help="start a private Xvfb server for the run")
+    parser.add_argument("--stub-tk", action="store_true", help="run without an X server on stub widgets (no drawing cost)")
+    args = parser.parse_args()
+
+    xvfb = start_xvfb() if args.xvfb else None
+    state_dir = None
+    try:
+        with contextlib.redirect_stdout(sys.stderr): # The display's own messages; stdout carries only the JSON results
+            import test as board
+            configure_display_module(board, args.port, args.teams, args.stub_tk)
+            state_dir = board.STATE_DIR
+            try:
+                root = tk_stub.Tk() if args.stub_tk else tk.Tk()
+            except tk.TclError as e:
+                sys.exit(f"ERROR: Cannot open a display ({e}). Run under xvfb-run or pass --xvfb.")
+            app = board.ScoreboardApp(root)
+            if args.replay:
+                try:
+                    generator = CaptureReplayer(args.replay, "127.0.0.1", args.port, args.replay_speed)
+                except (OSError, ValueError) as e:
+                    sys.exit(f"ERROR: {e}")
+            else:
+                generator = LoadGenerator("127.0.0.1", args.port, args.rate, args.teams, args.pattern,
+                                          args.burst_size, args.burst_interval_ms, args.packet_format, record_send_times=True)
+            run = BenchmarkRun(app, generator, board.TEAM_NAMES_ORDERED_IN_PACKET[0])
+            timing = {}
+
+            def generate_load():
+                timing["elapsed"] = generator.run(args.duration) # Sending time only; DRAIN_MS after it isn't load
+
+            load_thread = threading.Thread(target=generate_load, daemon=True)
+
+            def finish():
+                if load_thread.is_alive():
+                    app.scheduler.call_later(100, finish, name="benchmark_finish")
+                    return
+                app.on_closing()
+
+            app.scheduler.call_every(RSS_SAMPLE_INTERVAL_MS, run.sample_rss, name="benchmark_rss")
+            app.scheduler.call_later(WARMUP_MS, load_thread.start, name="benchmark_start")
+            app.scheduler.call_later(WARMUP_MS + int(args.duration * 1000) + DRAIN_MS, finish, name="benchmark_finish")
+            run.sample_rss()
+            root.mainloop()
+            generator.close()
+
+            config_keys = ("replay", "replay_speed", "teams", "duration") if args.replay else ("rate", "teams", "pattern", "burst_size", "burst_interval_ms", "packet_format", "duration")
+            config = {key: getattr(args, key) for key in config_keys + ("stub_tk",)} # Only compare runs made in the same mode
+            results = run.results(config, timing.get("elapsed", args.duration))
+            if args.stub_tk: results["widget_configure_calls"] = tk_stub.StubWidget.configure_calls
+    finally:
+        if xvfb: xvfb.terminate()
+        if state_dir: shutil.rmtree(state_dir, ignore_errors=True) # Temporary scores, history and image cache
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as results_file: results_file.write(output + "\n")
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline) as baseline_file: regressions = find_regressions(results, json.load(baseline_file))
+        for regression in regressions: print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
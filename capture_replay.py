@@ -0,0 +1,107 @@
+import argparse
+import collections
+import random
+import socket
+import time
+
+import score_protocol
+from packet_capture import read_capture
+
+# --- Replay a packet capture against a running display ---
+# Sends the datagrams of a capture written by the display (CAPTURE_ENABLED in test.py) to a display, with
+# the original timing scaled by --speed, or back to back with --max-speed. Each frame's sender id is
+# swapped for a fresh one per run, so replaying the same capture twice into one display isn't dropped as
+# duplicate or stale frames (--keep-sender-ids turns that off).
+#
+#   python capture_replay.py captures/capture-20261016-083000.hpcap --host 127.0.0.1
+#   python capture_replay.py assembly.hpcap --speed 10
+#   python capture_replay.py assembly.hpcap --max-speed --port 12346
+#
+# benchmark.py --replay uses CaptureReplayer in place of the synthetic load generator.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 12345
+SENDER_ID_OFFSET = 6 # Byte offset of the sender id in the binary frame header (see score_protocol.py)
+
+
+class CaptureReplayer:
+    def __init__(self, path, host=DEFAULT_HOST, port=DEFAULT_PORT, speed=1.0, rewrite_sender_ids=True):
+        self.path = path
+        self.start_time, self.records = read_capture(path) # Raises OSError/ValueError for a missing or foreign file
+        self.target = (host, port)
+        self.speed = speed # 0 sends as fast as possible
+        self.rewrite_sender_ids = rewrite_sender_ids
+        self.sender_ids = {} # Captured sender id -> the id used for this run
+        self.sent = 0
+        self.send_errors = 0
+        self.max_behind_s = 0.0 # Worst lag behind the scaled schedule, to tell whether the replay kept up
+        self.send_times = collections.deque() # Interface shared with LoadGenerator; captured frames carry no send-time marker
+        self.stopped = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def replace_sender_id(self, data):
+        if len(data) < score_protocol.HEADER_STRUCT.size or data[:2] != score_protocol.PROTOCOL_MAGIC: return data
+        captured_id = data[SENDER_ID_OFFSET:SENDER_ID_OFFSET + 4]
+        if captured_id not in self.sender_ids: self.sender_ids[captured_id] = random.getrandbits(32).to_bytes(4, "big")
+        return data[:SENDER_ID_OFFSET] + self.sender_ids[captured_id] + data[SENDER_ID_OFFSET + 4:]
+
+    def run(self, duration_s=None):
+        # Plays the capture once (or its first duration_s seconds); returns the elapsed time.
+        # Deadlines are absolute (start + offset / speed), so sleep overshoot doesn't accumulate.
+        start = time.monotonic()
+        for offset_s, _, data in self.records:
+            if self.stopped: break
+            if self.speed > 0:
+                if duration_s is not None and offset_s / self.speed > duration_s: break
+                delay = start + offset_s / self.speed - time.monotonic()
+                if delay > 0: time.sleep(delay)
+                else: self.max_behind_s = max(self.max_behind_s, -delay)
+            elif duration_s is not None and time.monotonic() - start > duration_s:
+                break
+            if self.rewrite_sender_ids: data = self.replace_sender_id(data)
+            try:
+                self.sock.sendto(data, self.target)
+                self.sent += 1
+            except OSError:
+                self.send_errors += 1
+        return time.monotonic() - start
+
+    def stop(self):
+        self.stopped = True
+
+    def close(self):
+        self.records.close()
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a scoreboard packet capture against a display.")
+    parser.add_argument("path", help="capture file written by the display")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale: 1 = as recorded, 10 = ten times faster")
+    parser.add_argument("--max-speed", action="store_true", help="send back to back, ignoring the recorded timing")
+    parser.add_argument("--keep-sender-ids", action="store_true", help="send the frames unchanged")
+    args = parser.parse_args()
+    if args.speed <= 0 and not args.max_speed: parser.error("--speed must be positive (or use --max-speed)")
+
+    try:
+        replayer = CaptureReplayer(args.path, args.host, args.port, 0 if args.max_speed else args.speed, not args.keep_sender_ids)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"ERROR: {e}")
+    print(f"Replaying capture started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(replayer.start_time))} "
+          f"to {args.host}:{args.port} at {'maximum speed' if args.max_speed else f'{args.speed:g}x'}")
+    try:
+        elapsed_s = replayer.run()
+    except KeyboardInterrupt:
+        elapsed_s = None
+    finally:
+        replayer.close()
+    summary = f"Sent {replayer.sent} datagrams, {replayer.send_errors} send errors"
+    if elapsed_s is not None: summary += f" in {elapsed_s:.1f} s ({replayer.sent / max(elapsed_s, 1e-9):.0f}/s)"
+    if not args.max_speed: summary += f", at most {replayer.max_behind_s * 1000:.1f} ms behind schedule"
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
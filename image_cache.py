@@ -0,0 +1,158 @@
+import hashlib
+import os
+import struct
+import tkinter as tk
+from collections import OrderedDict
+
+# --- Decoded image cache for the scoreboard display ---
+# PhotoImages are decoded once and kept keyed by (path, mtime, variant), so showing an emblem does not
+# touch the SD card again unless the file was replaced. Scaled variants are derived from the decoded
+# original with Tk's integer zoom/subsample and cached alongside it.
+#
+# With a disk_cache_dir, decoded images are also written back in the form Tk loads fastest, so the next
+# start skips the work: PPM (no compression to undo) for opaque images, and for images with transparency,
+# which PPM can't hold, the already scaled variant as PNG so the full-size original isn't decoded and
+# subsampled again. get_fitted reads the size from the file header (once per path and mtime), so a cached
+# variant is loaded directly.
+
+IMAGE_CACHE_MAX_ENTRIES = 32 # Originals and scaled variants together
+
+
+class ImageCache:
+    def __init__(self, master, max_entries=IMAGE_CACHE_MAX_ENTRIES, disk_cache_dir=None):
+        self.master = master
+        self.max_entries = max_entries
+        self.disk_cache_dir = disk_cache_dir
+        if disk_cache_dir:
+            try: os.makedirs(disk_cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"WARNING: Image disk cache disabled, cannot use {disk_cache_dir}: {e}")
+                self.disk_cache_dir = None
+        self.entries = OrderedDict() # (path, mtime, variant) -> PhotoImage, least recently used first
+        self.sizes = {} # path -> (mtime, (width, height) or None), so get_fitted reads each header once
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, variant=None):
+        # variant is None for the original or ("zoom"/"subsample", x, y). Returns None if the file can't be loaded.
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            print(f"WARNING: Image file not found: {path}")
+            return None
+        key = (path, mtime, variant)
+        image = self.entries.get(key)
+        if image is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return image
+        self.misses += 1
+        cache_path, cache_format = self.disk_cache_entry(path, mtime, variant)
+        image = None
+        if cache_path and os.path.exists(cache_path):
+            try: image = tk.PhotoImage(master=self.master, file=cache_path)
+            except tk.TclError: image = None # Damaged cache file; rebuilt below
+        if image is None:
+            try:
+                if variant is None:
+                    image = tk.PhotoImage(master=self.master, file=path)
+                else:
+                    original = self.get(path)
+                    if original is None: return None
+                    operation, x, y = variant
+                    image = original.zoom(x, y) if operation == "zoom" else original.subsample(x, y)
+            except (tk.TclError, ValueError) as e:
+                print(f"WARNING: ERROR loading image '{path}': {e}")
+                return None
+            if cache_path: self.write_disk_cache(image, cache_path, cache_format)
+        self.drop_stale(path, mtime)
+        self.entries[key] = image
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return image
+
+    def get_fitted(self, path, max_width, max_height, allow_upscale=False):
+        # Largest integer zoom (if allowed) or smallest subsample that fits the box, e.g. per screen size.
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            print(f"WARNING: Image file not found: {path}")
+            return None
+        cached = self.sizes.get(path)
+        if cached is not None and cached[0] == mtime:
+            size = cached[1]
+        else:
+            size = read_image_size(path) # From the header, so a cached variant doesn't need the original decoded
+            self.sizes[path] = (mtime, size)
+        if size is None:
+            original = self.get(path)
+            if original is None: return None
+            size = (original.width(), original.height())
+        width, height = size
+        if width <= 0 or height <= 0: return self.get(path)
+        if width > max_width or height > max_height:
+            factor = max(-(-width // max(max_width, 1)), -(-height // max(max_height, 1)))
+            return self.get(path, ("subsample", factor, factor))
+        if allow_upscale:
+            factor = min(max_width // width, max_height // height)
+            if factor > 1: return self.get(path, ("zoom", factor, factor))
+        return self.get(path)
+
+    def drop_stale(self, path, mtime):
+        for key in [key for key in self.entries if key[0] == path and key[1] != mtime]:
+            del self.entries[key]
+
+    def disk_cache_entry(self, path, mtime, variant):
+        # (cache file path, Tk format) for this image, or (None, None) if caching it would not save any work.
+        if not self.disk_cache_dir: return None, None
+        transparent = image_has_transparency(path)
+        if transparent and variant is None: return None, None # The cached copy would just be the same PNG
+        cache_format = "png" if transparent else "ppm"
+        digest = hashlib.sha1(f"{os.path.abspath(path)}|{mtime}|{variant}".encode("utf-8")).hexdigest()[:16]
+        name = f"{os.path.splitext(os.path.basename(path))[0]}-{digest}.{cache_format}"
+        return os.path.join(self.disk_cache_dir, name), cache_format
+
+    def write_disk_cache(self, image, cache_path, cache_format):
+        temp_path = cache_path + ".tmp"
+        try:
+            image.write(temp_path, format=cache_format)
+            os.replace(temp_path, cache_path)
+        except (tk.TclError, OSError) as e:
+            print(f"WARNING: Could not write image cache file {cache_path}: {e}")
+
+
+def read_image_size(path):
+    # (width, height) from a PNG or PPM header without decoding the image, or None for other formats.
+    try:
+        with open(path, "rb") as image_file: header = image_file.read(64)
+    except OSError:
+        return None
+    if header[:8] == b"\x89PNG\r\n\x1a\n" and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if header[:2] in (b"P6", b"P5"):
+        fields = header.split()
+        try: return int(fields[1]), int(fields[2])
+        except (IndexError, ValueError): return None
+    return None
+
+
+def image_has_transparency(path):
+    # PNG colour types 4 and 6 carry alpha; palette/grey/RGB images can add it with a tRNS chunk.
+    # Anything that isn't a PNG is treated as possibly transparent, so it is never flattened to PPM.
+    try:
+        with open(path, "rb") as image_file:
+            if image_file.read(8) != b"\x89PNG\r\n\x1a\n": return True
+            while True:
+                chunk_header = image_file.read(8)
+                if len(chunk_header) < 8: return False
+                length, chunk_type = struct.unpack(">I4s", chunk_header)
+                if chunk_type == b"IHDR":
+                    ihdr = image_file.read(length)
+                    if len(ihdr) >= 10 and ihdr[9] in (4, 6): return True
+                    image_file.seek(4, os.SEEK_CUR)
+                    continue
+                if chunk_type == b"tRNS": return True
+                if chunk_type in (b"IDAT", b"IEND"): return False # tRNS must come before the image data
+                image_file.seek(length + 4, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return True
@@ -0,0 +1,102 @@
+import argparse
+import collections
+import random
+import socket
+import time
+
+import score_protocol
+
+# --- Synthetic score packet generator ---
+# Sends score frames to a display at a configurable rate, team count and burst pattern. The first team's
+# score carries the frame's sequence number so a benchmark can tell which packet a rendered state came from.
+#
+#   python load_generator.py --host 192.168.1.100 --rate 200 --duration 30
+#   python load_generator.py --pattern burst --burst-size 50 --burst-interval-ms 1000 --teams 4
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 12345
+
+
+class LoadGenerator:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, rate=100.0, teams=4, pattern="steady",
+                 burst_size=50, burst_interval_ms=1000, packet_format="binary", record_send_times=False):
+        self.target = (host, port)
+        self.rate = rate
+        self.teams = teams
+        self.pattern = pattern
+        self.burst_size = burst_size
+        self.burst_interval_s = burst_interval_ms / 1000.0
+        self.packet_format = packet_format
+        self.sender_id = random.getrandbits(32)
+        self.sequence = 0
+        self.sent = 0
+        self.send_errors = 0
+        self.send_times = collections.deque() if record_send_times else None # (sequence, time.monotonic() at send), oldest first; the consumer pops them
+        self.stopped = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def make_packet(self):
+        self.sequence += 1
+        scores = [self.sequence] + [random.randint(0, 1000) for _ in range(self.teams - 1)]
+        if self.packet_format == "text":
+            return score_protocol.encode_text_scores(scores)
+        return score_protocol.encode_full_state(self.sender_id, self.sequence, scores)
+
+    def send_one(self):
+        packet = self.make_packet()
+        if self.send_times is not None: self.send_times.append((self.sequence, time.monotonic()))
+        try:
+            self.sock.sendto(packet, self.target)
+            self.sent += 1
+        except OSError:
+            self.send_errors += 1
+
+    def run(self, duration_s):
+        # steady: one packet every 1/rate seconds. burst: burst_size packets back to back every burst_interval.
+        start = time.monotonic()
+        next_send = start
+        while not self.stopped and time.monotonic() - start < duration_s:
+            if self.pattern == "burst":
+                for _ in range(self.burst_size): self.send_one()
+                next_send += self.burst_interval_s
+            else:
+                self.send_one()
+                next_send += 1.0 / self.rate
+            delay = next_send - time.monotonic()
+            if delay > 0: time.sleep(delay)
+        return time.monotonic() - start
+
+    def stop(self):
+        self.stopped = True
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send synthetic score packets to a scoreboard display.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rate", type=float, default=100.0, help="packets per second (steady pattern)")
+    parser.add_argument("--teams", type=int, default=4)
+    parser.add_argument("--pattern", choices=["steady", "burst"], default="steady")
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--burst-interval-ms", type=int, default=1000)
+    parser.add_argument("--format", dest="packet_format", choices=["binary", "text"], default="binary")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.host, args.port, args.rate, args.teams, args.pattern,
+                              args.burst_size, args.burst_interval_ms, args.packet_format)
+    try:
+        elapsed_s = generator.run(args.duration)
+    except KeyboardInterrupt:
+        elapsed_s = args.duration
+    finally:
+        generator.close()
+    print(f"Sent {generator.sent} packets in {elapsed_s:.1f} s ({generator.sent / max(elapsed_s, 1e-9):.0f}/s), "
+          f"{generator.send_errors} send errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+from score_store import iter_queue_batches
+
+# --- Datagram capture for incident analysis and replay ---
+# The display's listener hands every received datagram to PacketCapture.record, which only puts it on a
+# queue; a background thread packs whatever arrived in the last CAPTURE_FLUSH_INTERVAL_S and writes it in
+# one buffered write, so recording never waits on the SD card. capture_replay.py plays a capture back.
+#
+# File layout (network byte order):
+#   header  magic 4s "HPCP", version B, unix time the capture started d
+#   records time since the start in microseconds Q, source IPv4 address 4s, source port H, length H, datagram
+# A torn record at the end (power loss or kill mid-write) is ignored on reading.
+
+CAPTURE_MAGIC = b"HPCP"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER_STRUCT = struct.Struct("!4sBd")
+CAPTURE_RECORD_STRUCT = struct.Struct("!Q4sHH")
+CAPTURE_FLUSH_INTERVAL_S = 0.5
+CAPTURE_MAX_PENDING = 10000 # Datagrams queued for the writer before new ones are dropped (and counted)
+CAPTURE_WRITE_BUFFER_SIZE = 1 << 16
+
+
+class PacketCapture:
+    def __init__(self, path, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes # Recording stops once the file reaches this size
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.capture_file = open(path, "wb", buffering=CAPTURE_WRITE_BUFFER_SIZE)
+        self.capture_file.write(CAPTURE_HEADER_STRUCT.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+        self.capture_file.flush()
+        self.bytes_written = CAPTURE_HEADER_STRUCT.size
+        self.start_monotonic = time.monotonic()
+        self.pending = queue.Queue(maxsize=CAPTURE_MAX_PENDING)
+        self.recorded = 0
+        self.dropped = 0 # Queue overflow, and everything received after the size limit was reached
+        self.dropped_lock = threading.Lock() # Counted from the listener thread and the writer thread
+        self.write_errors = 0
+        self.full = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def record(self, data, addr, received_at=None):
+        # Called from the listener thread for every datagram; never touches the disk.
+        if self.full:
+            self.count_dropped(1); return
+        try:
+            self.pending.put_nowait((time.monotonic() if received_at is None else received_at, addr, data))
+        except queue.Full:
+            self.count_dropped(1)
+
+    def count_dropped(self, count):
+        with self.dropped_lock: self.dropped += count
+
+    def close(self):
+        if self.thread is not None:
+            self.pending.put(None) # Blocks only if the writer is far behind, which is fine at shutdown
+            self.thread.join(timeout=5)
+            self.thread = None
+        try: self.capture_file.close()
+        except OSError: pass
+
+    def _writer(self):
+        for batch, _ in iter_queue_batches(self.pending, CAPTURE_FLUSH_INTERVAL_S):
+            if not batch: continue
+            if self.full: self.count_dropped(len(batch)) # Queued before the limit was reached
+            else: self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        parts = []
+        for received_at, addr, data in batch:
+            try: address = socket.inet_aton(addr[0])
+            except OSError: address = bytes(4)
+            offset_us = max(int((received_at - self.start_monotonic) * 1000000), 0)
+            parts.append(CAPTURE_RECORD_STRUCT.pack(offset_us, address, addr[1], len(data)))
+            parts.append(data)
+        chunk = b"".join(parts)
+        if self.max_bytes and self.bytes_written + len(chunk) > self.max_bytes:
+            self.full = True
+            self.count_dropped(len(batch))
+            print(f"WARNING: Capture {self.path} reached {self.max_bytes} bytes, recording stopped")
+            return
+        try:
+            self.capture_file.write(chunk)
+            self.capture_file.flush()
+        except OSError as e:
+            self.write_errors += 1
+            print(f"WARNING: Could not write capture {self.path}: {e}")
+            return
+        self.bytes_written += len(chunk)
+        self.recorded += len(batch)
+
+
+def read_capture(path):
+    # Returns (unix time the capture started, iterator of (seconds since the start, (ip, port), datagram)).
+    # Records are read one at a time, so long soak captures don't have to fit in memory.
+    capture_file = open(path, "rb")
+    header = capture_file.read(CAPTURE_HEADER_STRUCT.size)
+    if len(header) < CAPTURE_HEADER_STRUCT.size or header[:4] != CAPTURE_MAGIC:
+        capture_file.close()
+        raise ValueError(f"{path} is not a packet capture")
+    _, version, start_time = CAPTURE_HEADER_STRUCT.unpack(header)
+    if version != CAPTURE_VERSION:
+        capture_file.close()
+        raise ValueError(f"{path} is capture version {version}, expected {CAPTURE_VERSION}")
+    return start_time, _iter_records(capture_file, path)
+
+
+def _iter_records(capture_file, path):
+    try:
+        while True:
+            head = capture_file.read(CAPTURE_RECORD_STRUCT.size)
+            if not head: return
+            if len(head) < CAPTURE_RECORD_STRUCT.size:
+                print(f"WARNING: Ignoring a torn record at the end of {path}")
+                return
+            offset_us, address, port, length = CAPTURE_RECORD_STRUCT.unpack(head)
+            data = capture_file.read(length)
+            if len(data) < length:
+                print(f"WARNING: Ignoring a torn record at the end of {path}")
+                return
+            yield offset_us / 1000000, (socket.inet_ntoa(address), port), data
+    finally:
+        capture_file.close()
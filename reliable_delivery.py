@@ -0,0 +1,159 @@
+import queue
+import select
+import socket
+import threading
+import time
+
+import score_protocol
+
+# --- Acknowledged delivery of score frames (ScoreSender's reliable mode) ---
+# Frames are sent with ACK_REQUESTED; each display answers with an MSG_ACK carrying the frame's sequence.
+# A background thread waits for the ACKs on the sender's socket and retransmits whatever is still
+# unacknowledged with exponential backoff (RETRY_INITIAL_S, doubling up to RETRY_MAX_S) until
+# DELIVERY_TIMEOUT_S, then reports the outcome per display through a queue the Tk thread drains.
+#
+# Unicast targets are delivered once every frame is acknowledged by that address. A multicast group has
+# no fixed member list, so its frames are retransmitted until some display acknowledges each of them,
+# and the result names the displays that answered.
+
+RETRY_INITIAL_S = 0.25
+RETRY_MAX_S = 2.0
+DELIVERY_TIMEOUT_S = 6.0
+ACK_BUFFER_SIZE = 64
+
+
+def is_multicast(ip):
+    try:
+        return 224 <= int(ip.split(".")[0]) <= 239
+    except ValueError:
+        return False
+
+
+class Delivery:
+    def __init__(self, target, address, frames, label):
+        self.target = target # "host:port" as typed, for the status bar
+        self.address = address # (resolved ip, port)
+        self.frames = dict(frames) # sequence -> packet, until acknowledged
+        self.sequences = set(self.frames)
+        self.label = label
+        self.multicast = is_multicast(address[0])
+        self.acked_by = set()
+        self.attempts = 1
+        self.retry_s = RETRY_INITIAL_S
+        now = time.monotonic()
+        self.next_retry = now + self.retry_s
+        self.deadline = now + DELIVERY_TIMEOUT_S
+
+
+class DeliveryWorker:
+    def __init__(self, sock, sender_id):
+        self.sock = sock # Non-blocking; shared with the UI thread, which only ever calls sendto on it
+        self.sender_id = sender_id
+        self.submissions = queue.Queue()
+        self.results = queue.Queue() # ("host:port", delivered, detail) for the Tk thread
+        self.wakeup_read, self.wakeup_write = socket.socketpair() # Works with select on Windows too, unlike a pipe
+        self.wakeup_read.setblocking(False)
+        self.deliveries = []
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, frames, targets, label):
+        # frames: (sequence, packet) pairs sent with ACK_REQUESTED to each (host, port) in targets.
+        # Called from the Tk thread; never blocks (name lookups happen on the worker).
+        self.submissions.put((list(frames), list(targets), label))
+        self.wake()
+
+    def wake(self):
+        try: self.wakeup_write.send(b"\0")
+        except OSError: pass
+
+    def close(self):
+        self.stopped = True
+        self.wake()
+        self.thread.join(timeout=1)
+        self.wakeup_read.close(); self.wakeup_write.close()
+
+    def run(self):
+        while not self.stopped:
+            self.start_submissions()
+            now = time.monotonic()
+            timeout = min((delivery.next_retry for delivery in self.deliveries), default=now + 1.0) - now
+            try:
+                readable, _, _ = select.select([self.sock, self.wakeup_read], [], [], max(timeout, 0))
+            except (OSError, ValueError):
+                return # Socket closed while shutting down
+            if self.wakeup_read in readable:
+                try:
+                    while self.wakeup_read.recv(4096): pass
+                except (BlockingIOError, OSError): pass
+            if self.sock in readable: self.read_acks()
+            self.retransmit_due()
+
+    def start_submissions(self):
+        while True:
+            try:
+                frames, targets, label = self.submissions.get_nowait()
+            except queue.Empty:
+                return
+            for host, port in targets:
+                target = f"{host}:{port}"
+                try:
+                    address = (socket.gethostbyname(host), port)
+                    for _, packet in frames: self.sock.sendto(packet, address)
+                except OSError as e:
+                    self.results.put((target, False, f"{label}: {e}"))
+                    continue
+                self.deliveries.append(Delivery(target, address, frames, label))
+
+    def read_acks(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(ACK_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return # e.g. Windows reports an earlier ICMP port unreachable here; the retry timer handles it
+            try:
+                msg_type, sender_id, sequence, _ = score_protocol.decode_packet(data)
+            except score_protocol.ProtocolError:
+                continue
+            if msg_type == score_protocol.MSG_ACK and sender_id == self.sender_id:
+                self.apply_ack(addr, sequence)
+
+    def apply_ack(self, addr, sequence):
+        ack_ip = addr[0]
+        for delivery in list(self.deliveries):
+            if delivery.multicast:
+                if sequence not in delivery.sequences: continue
+                delivery.frames.pop(sequence, None); delivery.acked_by.add(ack_ip)
+            elif addr == delivery.address and sequence in delivery.frames:
+                del delivery.frames[sequence]
+                if not delivery.frames: self.finish(delivery, True, f"{delivery.label}: delivered ({delivery.attempts} send{'s' if delivery.attempts > 1 else ''})")
+
+    def retransmit_due(self):
+        now = time.monotonic()
+        for delivery in list(self.deliveries):
+            if now >= delivery.deadline:
+                if delivery.multicast and delivery.acked_by and not delivery.frames:
+                    self.finish(delivery, True, f"{delivery.label}: acknowledged by {', '.join(sorted(delivery.acked_by))}")
+                elif delivery.multicast and delivery.acked_by:
+                    self.finish(delivery, False, f"{delivery.label}: only partly acknowledged by {', '.join(sorted(delivery.acked_by))}")
+                else:
+                    self.finish(delivery, False, f"{delivery.label}: FAILED, no ACK after {delivery.attempts} sends")
+                continue
+            if now < delivery.next_retry: continue
+            if delivery.multicast and not delivery.frames:
+                delivery.next_retry = delivery.deadline # Keep collecting ACKs from other displays until the deadline
+                continue
+            try:
+                for packet in delivery.frames.values(): self.sock.sendto(packet, delivery.address)
+            except OSError:
+                pass # Counted as a lost attempt; the next retry or the deadline decides
+            delivery.attempts += 1
+            delivery.retry_s = min(delivery.retry_s * 2, RETRY_MAX_S)
+            delivery.next_retry = min(now + delivery.retry_s, delivery.deadline)
+
+    def finish(self, delivery, delivered, detail):
+        self.deliveries.remove(delivery)
+        self.results.put((delivery.target, delivered, detail))
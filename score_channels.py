@@ -0,0 +1,62 @@
+import score_protocol
+from score_ranking import IncrementalRanking
+
+# --- Per-channel score state for one display process showing several boards ---
+# Every binary frame carries a channel byte (0 = house points). The display keeps one ScoreChannel per
+# configured channel, all fed by the same listener. Only the channel on screen is ranked and rendered;
+# updates for the others just replace their points dict, and their ranking catches up in one pass when
+# they are shown (IncrementalRanking.update only moves the teams whose points changed).
+
+
+class ScoreChannel:
+    def __init__(self, channel_id, title, team_names, initial_points=None):
+        self.channel_id = channel_id
+        self.title = title
+        self.team_names = list(team_names)
+        initial_points = initial_points or {}
+        self.team_points = {team_name: initial_points.get(team_name, 0) for team_name in self.team_names}
+        self.ranking = IncrementalRanking(self.team_names) # Brought up to date only while the channel is visible
+        self.sequence_tracker = score_protocol.SequenceTracker() # Full states: newest per sender wins, per channel
+        self.last_update_time = "Never"
+
+    def add_deltas(self, points, deltas):
+        # Adds the (team index, increment) pairs to points in place. Returns None, or why nothing was added.
+        problem = delta_problem(self.team_names, points, deltas)
+        if problem is None:
+            for team_index, increment in deltas: points[self.team_names[team_index]] += increment
+        return problem
+
+    def payload_problem(self, msg_type, payload):
+        # Why a decoded frame can't apply to this channel whatever its scores are, or None. Checked before acknowledging.
+        if msg_type == score_protocol.MSG_DELTA:
+            if any(team_index >= len(self.team_names) for team_index, _ in payload): return f"team index beyond {len(self.team_names) - 1}"
+        elif len(payload) != len(self.team_names):
+            return f"{len(payload)} scores, expected {len(self.team_names)}"
+        return None
+
+    def full_state(self, scores):
+        # Points dict for a full-state payload, or None if it has the wrong number of teams.
+        if len(scores) != len(self.team_names): return None
+        return dict(zip(self.team_names, scores))
+
+
+def delta_problem(team_names, points, deltas):
+    # Why a delta frame can't be applied to points as a whole, or None if it can. Shared with score_service.py.
+    totals = {}
+    for team_index, increment in deltas:
+        if team_index >= len(team_names): return f"team index beyond {len(team_names) - 1}"
+        team_name = team_names[team_index]
+        totals[team_name] = totals.get(team_name, points[team_name]) + increment
+    if not all(score_protocol.SCORE_MIN <= total <= score_protocol.SCORE_MAX for total in totals.values()):
+        return "a total would leave the 32-bit score range"
+    return None
+
+
+def build_channels(channel_config):
+    # channel_config: {channel id: {"title": ..., "teams": [...], "initial_points": {...}}}, as CHANNELS in test.py.
+    channels = {}
+    for channel_id, config in sorted(channel_config.items()):
+        if not 0 <= channel_id < score_protocol.MAX_CHANNELS:
+            raise ValueError(f"Channel {channel_id} out of range 0-{score_protocol.MAX_CHANNELS - 1}")
+        channels[channel_id] = ScoreChannel(channel_id, config.get("title", f"Channel {channel_id}"), config["teams"], config.get("initial_points"))
+    return channels
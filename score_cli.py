@@ -0,0 +1,229 @@
+import argparse
+import csv
+import json
+import queue
+import random
+import socket
+import sys
+import time
+
+import score_protocol
+from reliable_delivery import DeliveryWorker, DELIVERY_TIMEOUT_S
+
+# --- Headless score import ---
+# Streams a merit export (CSV, JSON array or JSON Lines), totals the points per team in one pass without
+# holding the file in memory, and sends the result as one update using the same frames as ScoreSender:
+#   deltas (default)  the totals are added to what the displays show (batched, MAX_DELTAS per datagram)
+#   full              the totals replace the displayed scores in one full-state frame
+#
+#   python score_cli.py week12.csv --target 192.168.1.100 --target 239.255.42.99
+#   python score_cli.py merits.jsonl --team-field house --points-field merits --mode full --reliable
+#   python score_cli.py heats.csv --channel 1 --teams red,blue,green,yellow --target 192.168.1.100
+#   some_export_tool | python score_cli.py - --format csv --dry-run
+#
+# Also usable as a library: aggregate(read_records(path), TEAM_NAMES_ORDER), then build_frames and send_frames.
+
+DEFAULT_UDP_PORT = 12345
+TEAM_NAMES_ORDER = ["castile", "capet", "essex", "milan"] # Packet order; must match the displays
+DEFAULT_TEAM_FIELD = "team"
+DEFAULT_POINTS_FIELD = "points"
+JSON_CHUNK_SIZE = 1 << 16
+MAX_REPORTED_BAD_ROWS = 5
+
+
+def detect_format(path):
+    if path.endswith(".jsonl") or path.endswith(".ndjson"): return "jsonl"
+    if path.endswith(".json"): return "json"
+    return "csv"
+
+
+class InvalidRecord:
+    # Stands in for a row that couldn't be decoded, so aggregate reports it as skipped like any other bad row.
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def read_records(path, record_format=None):
+    # Yields one dict per row/object (or InvalidRecord). Files are read incrementally, never all at once.
+    record_format = record_format or detect_format(path)
+    source = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if record_format == "csv":
+            yield from csv.DictReader(source)
+        elif record_format == "jsonl":
+            for line in source:
+                if not line.strip(): continue
+                try: yield json.loads(line)
+                except json.JSONDecodeError as e: yield InvalidRecord(f"invalid JSON ({e.msg} at column {e.colno})")
+        else:
+            yield from iter_json_array(source)
+    finally:
+        if source is not sys.stdin: source.close()
+
+
+def iter_json_array(stream):
+    # Decodes the objects of a top-level JSON array one at a time from fixed-size chunks.
+    # expecting: "[" at the start, "value or ]" after "[", "value" after ",", ", or ]" after a value.
+    decoder = json.JSONDecoder()
+    buffer = ""; position = 0; expecting = "["; eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n": position += 1
+        if position >= len(buffer):
+            if eof: raise ValueError("Truncated JSON array")
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk; position = 0
+            continue
+        char = buffer[position]
+        if expecting == "[":
+            if char != "[": raise ValueError("JSON input must be an array of objects (or use --format jsonl)")
+            expecting = "value or ]"; position += 1
+            continue
+        if expecting == ", or ]" or (expecting == "value or ]" and char == "]"):
+            if char == "]": return
+            if char != ",": raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+            expecting = "value"; position += 1
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+            if end == len(buffer) and not eof: raise ValueError("value may continue in the next chunk")
+        except ValueError:
+            if eof: raise ValueError("Invalid or truncated JSON array")
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk; position = 0
+            continue
+        yield record
+        position = end; expecting = ", or ]"
+
+
+def aggregate(records, team_names, team_field=DEFAULT_TEAM_FIELD, points_field=DEFAULT_POINTS_FIELD):
+    # Returns (totals per team in team_names order, rows used, [(row number, reason), ...] for rows skipped).
+    team_index = {name.lower(): index for index, name in enumerate(team_names)}
+    totals = [0] * len(team_names)
+    used = 0; skipped = []
+    for row_number, record in enumerate(records, 1):
+        if isinstance(record, InvalidRecord):
+            skipped.append((row_number, record.reason)); continue
+        if not isinstance(record, dict):
+            skipped.append((row_number, f"not an object: {record!r}")); continue
+        team = record.get(team_field)
+        index = team_index.get(str(team).strip().lower())
+        if index is None:
+            skipped.append((row_number, f"unknown team {team!r}")); continue
+        try:
+            points = parse_points(record.get(points_field))
+        except ValueError:
+            skipped.append((row_number, f"points not an integer: {record.get(points_field)!r}")); continue
+        totals[index] += points
+        used += 1
+    return totals, used, skipped
+
+
+def parse_points(value):
+    # Integer points from a CSV string or a JSON number; JSON exports often write whole numbers as 2.0.
+    if isinstance(value, float):
+        if not value.is_integer(): raise ValueError(f"{value} is not a whole number") # Also NaN and infinity
+        return int(value)
+    return int(str(value).strip())
+
+
+def build_frames(totals, mode, sender_id, first_sequence=1, ack_requested=False, channel=0):
+    # [(sequence, packet)] for the totals: delta frames for the non-zero teams, or one full-state frame.
+    if mode == "full":
+        return [(first_sequence, score_protocol.encode_full_state(sender_id, first_sequence, totals, ack_requested, channel=channel))]
+    deltas = [(team_index, points) for team_index, points in enumerate(totals) if points]
+    return score_protocol.encode_delta_frames(sender_id, first_sequence, deltas, ack_requested, channel) if deltas else []
+
+
+def parse_targets(target_strings, default_port):
+    targets = []
+    for target in target_strings:
+        host, _, port_str = target.partition(":")
+        targets.append((host, int(port_str) if port_str else default_port))
+    return targets
+
+
+def send_frames(frames, targets, reliable=False):
+    # Returns {"host:port": (delivered, detail)}. Plain sends are one sendto per frame per target.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("", 0))
+    results = {}
+    try:
+        if not reliable:
+            for host, port in targets:
+                try:
+                    for _, packet in frames: sock.sendto(packet, (host, port))
+                    results[f"{host}:{port}"] = (True, "sent")
+                except OSError as e:
+                    results[f"{host}:{port}"] = (False, str(e))
+            return results
+        sock.setblocking(False)
+        sender_id = score_protocol.decode_packet(frames[0][1])[1]
+        worker = DeliveryWorker(sock, sender_id)
+        try:
+            worker.submit(frames, targets, f"seq {frames[0][0]}-{frames[-1][0]}" if len(frames) > 1 else f"seq {frames[0][0]}")
+            deadline = time.monotonic() + DELIVERY_TIMEOUT_S + 1
+            while len(results) < len(targets) and time.monotonic() < deadline:
+                try:
+                    target, delivered, detail = worker.results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                results[target] = (delivered, detail)
+        finally:
+            worker.close()
+        return results
+    finally:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Total merit points from a CSV/JSON export and send them to the scoreboards.")
+    parser.add_argument("path", help="CSV, JSON array or JSON Lines file ('-' for stdin)")
+    parser.add_argument("--format", dest="record_format", choices=["csv", "json", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--team-field", default=DEFAULT_TEAM_FIELD)
+    parser.add_argument("--points-field", default=DEFAULT_POINTS_FIELD)
+    parser.add_argument("--teams", default=",".join(TEAM_NAMES_ORDER), help="comma-separated team names in packet order")
+    parser.add_argument("--channel", type=int, default=0, help="board on the displays (CHANNELS in test.py); 0 is the house points")
+    parser.add_argument("--mode", choices=["deltas", "full"], default="deltas", help="add the totals (deltas) or replace the scores (full)")
+    parser.add_argument("--target", action="append", default=[], help="display, multicast group or state service, as host or host:port (repeatable)")
+    parser.add_argument("--port", type=int, default=DEFAULT_UDP_PORT, help="port for targets given without one")
+    parser.add_argument("--reliable", action="store_true", help="wait for ACKs and retransmit (see reliable_delivery.py)")
+    parser.add_argument("--dry-run", action="store_true", help="print the totals without sending")
+    args = parser.parse_args()
+
+    team_names = args.teams.split(",")
+    start = time.perf_counter()
+    try:
+        totals, used, skipped = aggregate(read_records(args.path, args.record_format), team_names, args.team_field, args.points_field)
+    except (OSError, ValueError, csv.Error) as e:
+        sys.exit(f"ERROR: Could not read {args.path}: {e}")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for row_number, reason in skipped[:MAX_REPORTED_BAD_ROWS]: print(f"WARNING: Row {row_number} skipped: {reason}")
+    if len(skipped) > MAX_REPORTED_BAD_ROWS: print(f"WARNING: ... and {len(skipped) - MAX_REPORTED_BAD_ROWS} more rows skipped")
+    print(f"Read {used} rows in {elapsed_ms:.1f} ms: " + ", ".join(f"{name} {points:+d}" for name, points in zip(team_names, totals)))
+
+    sender_id = random.getrandbits(32)
+    try:
+        frames = build_frames(totals, args.mode, sender_id, ack_requested=args.reliable, channel=args.channel)
+    except score_protocol.ProtocolError as e:
+        sys.exit(f"ERROR: {e}")
+    if not frames:
+        print("Nothing to send: every total is 0.")
+        return
+    print(f"{len(frames)} frame(s), {sum(len(packet) for _, packet in frames)} bytes per target")
+    if args.dry_run: return
+    if not args.target: sys.exit("ERROR: Give at least one --target (or --dry-run)")
+    try:
+        targets = parse_targets(args.target, args.port)
+    except ValueError as e:
+        sys.exit(f"ERROR: Invalid target port: {e}")
+    results = send_frames(frames, targets, args.reliable)
+    for target, (delivered, detail) in results.items(): print(f"{target}: {detail}")
+    for host, port in targets:
+        if f"{host}:{port}" not in results: print(f"{host}:{port}: no result before the deadline")
+    if not all(delivered for delivered, _ in results.values()) or len(results) < len(targets): sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+
+from score_protocol import SCORE_MAX, SCORE_MIN
+from score_store import set_aside_file
+
+# --- Score history time-series for the scoreboard display ---
+# A fixed-capacity ring buffer in a memory-mapped file, stored column-wise so every team's scores (and the
+# timestamps) form one contiguous native-endian array:
+#   header: magic 4s, version I, team count I, capacity I, next slot I, record count I
+#   timestamps: capacity x int64 unix seconds
+#   scores: team count x capacity x int32
+# Reading goes through memoryview casts of the mapping, so downsampling months of history for a trend
+# view is done with bisect/min/max over array slices instead of building Python lists of every record.
+# Updates closer together than HISTORY_MIN_INTERVAL_S replace the newest sample rather than adding one.
+
+HISTORY_MAGIC = b"HPTS"
+HISTORY_VERSION = 1
+HEADER_STRUCT = struct.Struct("=4sIIIII")
+HISTORY_CAPACITY = 262144 # At one sample per minute this is about six months
+HISTORY_MIN_INTERVAL_S = 60
+
+
+class ScoreHistory:
+    def __init__(self, path, team_count, capacity=HISTORY_CAPACITY):
+        self.path = path
+        self.team_count = team_count
+        self.capacity = capacity
+        self.file_size = HEADER_STRUCT.size + capacity * 8 + team_count * capacity * 4
+        self.history_file = None
+        self.mapping = None
+        self.open()
+
+    def open(self):
+        exists = os.path.exists(self.path)
+        if exists and not self.has_expected_layout():
+            # e.g. the team count changed: the old history is kept next to the new one, not overwritten.
+            print(f"WARNING: {self.path} has a different layout, kept it as {set_aside_file(self.path)} and started a new score history")
+            exists = False
+        self.history_file = open(self.path, "r+b" if exists else "w+b")
+        if not exists: self.history_file.truncate(self.file_size)
+        self.mapping = mmap.mmap(self.history_file.fileno(), self.file_size)
+        _, _, _, _, self.next_slot, self.count = HEADER_STRUCT.unpack_from(self.mapping, 0)
+        if not exists: self.write_header()
+        view = self.view = memoryview(self.mapping)
+        timestamps_end = HEADER_STRUCT.size + self.capacity * 8
+        self.timestamps = view[HEADER_STRUCT.size:timestamps_end].cast("q")
+        self.columns = [view[timestamps_end + team * self.capacity * 4:timestamps_end + (team + 1) * self.capacity * 4].cast("i")
+                        for team in range(self.team_count)]
+
+    def has_expected_layout(self):
+        if os.path.getsize(self.path) != self.file_size: return False
+        with open(self.path, "rb") as history_file: header = history_file.read(HEADER_STRUCT.size)
+        return HEADER_STRUCT.unpack(header)[:4] == (HISTORY_MAGIC, HISTORY_VERSION, self.team_count, self.capacity)
+
+    def write_header(self):
+        HEADER_STRUCT.pack_into(self.mapping, 0, HISTORY_MAGIC, HISTORY_VERSION, self.team_count, self.capacity, self.next_slot, self.count)
+
+    def append(self, scores, timestamp=None):
+        # Called from the Tk thread; False (and nothing written) if a score doesn't fit the int32 columns.
+        if not all(SCORE_MIN <= score <= SCORE_MAX for score in scores):
+            print(f"WARNING: Not recording score history outside the 32-bit range: {scores}")
+            return False
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        newest_slot = (self.next_slot - 1) % self.capacity
+        if self.count and timestamp - self.timestamps[newest_slot] < HISTORY_MIN_INTERVAL_S:
+            slot = newest_slot # Keep the newest score for this interval, without moving its timestamp forward
+        else:
+            slot = self.next_slot
+            self.timestamps[slot] = timestamp
+            self.next_slot = (slot + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        for team, score in enumerate(scores):
+            self.columns[team][slot] = score
+        self.write_header()
+        return True
+
+    def segments(self):
+        # The ring as (start, end) slot ranges in chronological order.
+        if self.count < self.capacity: return [(0, self.count)]
+        return [(self.next_slot, self.capacity), (0, self.next_slot)]
+
+    def downsample(self, team, columns, start_time, end_time):
+        # Min/max of the team's score for each of `columns` equal time buckets in [start_time, end_time).
+        # Returns a list of (min, max) or None for buckets without samples.
+        result = [None] * columns
+        if columns <= 0 or end_time <= start_time: return result
+        column = self.columns[team]
+        bucket_s = (end_time - start_time) / columns
+        for segment_start, segment_end in self.segments():
+            timestamps = self.timestamps[segment_start:segment_end]
+            scores = column[segment_start:segment_end]
+            index = bisect.bisect_left(timestamps, start_time)
+            while index < len(timestamps):
+                bucket = int((timestamps[index] - start_time) // bucket_s)
+                if bucket >= columns: break
+                bucket_end = bisect.bisect_left(timestamps, start_time + (bucket + 1) * bucket_s, index)
+                bucket_scores = scores[index:bucket_end]
+                low, high = min(bucket_scores), max(bucket_scores)
+                if result[bucket] is not None: low, high = min(low, result[bucket][0]), max(high, result[bucket][1])
+                result[bucket] = (low, high)
+                index = bucket_end
+        return result
+
+    def close(self):
+        if self.mapping is None: return
+        self.timestamps.release()
+        for column in self.columns: column.release()
+        self.view.release()
+        self.mapping.flush()
+        self.mapping.close()
+        self.history_file.close()
+        self.mapping = None
@@ -0,0 +1,210 @@
+import bisect
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Lightweight metrics and runtime profiling for the scoreboard display ---
+# Counters, gauges and fixed-bucket histograms rendered in the Prometheus text format, served from a
+# small HTTP endpoint on a background thread:
+#   GET /metrics              Prometheus scrape
+#   GET /profile/start        start cProfile on the Tk thread
+#   GET /profile/stop         stop it and return the top functions by cumulative time
+#   GET /tracemalloc/start    start tracing allocations
+#   GET /tracemalloc/snapshot top allocation sites since tracing started
+#   GET /tracemalloc/stop
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+PROFILE_TOP_FUNCTIONS = 40
+TRACEMALLOC_TOP_LINES = 25
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock() # Incremented from the listener thread as well as the Tk thread
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self):
+        return "counter", [("", self.value)]
+
+
+class Gauge:
+    def __init__(self, name, help_text, function=None):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.function = function # If set, the gauge is read from it at scrape time
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        return "gauge", [("", self.function() if self.function else self.value)]
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.bucket_counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def samples(self):
+        with self.lock:
+            bucket_counts, total, count = list(self.bucket_counts), self.total, self.count
+        samples, cumulative = [], 0
+        for upper_bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+            cumulative += bucket_count
+            le = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+            samples.append((f'_bucket{{le="{le}"}}', cumulative))
+        samples.append(("_sum", total))
+        samples.append(("_count", count))
+        return "histogram", samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = [] # Callables returning [(name, type, help, [(labels, value)])] at scrape time
+
+    def counter(self, name, help_text):
+        return self._add(Counter(name, help_text))
+
+    def gauge(self, name, help_text, function=None):
+        return self._add(Gauge(name, help_text, function))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render_prometheus(self):
+        lines = []
+        for metric in self.metrics:
+            metric_type, samples = metric.samples()
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric_type}")
+            lines.extend(f"{metric.name}{suffix} {value}" for suffix, value in samples)
+        for collector in self.collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                lines.append(f"# collector error: {type(e).__name__} - {e}")
+                continue
+            for name, metric_type, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+class ProfilerControl:
+    # cProfile only sees the thread that enabled it, so start/stop are run on the Tk thread via run_on_main.
+    def __init__(self, run_on_main):
+        self.run_on_main = run_on_main
+        self.profiler = None
+
+    def start_profile(self):
+        def start():
+            if self.profiler is not None: return "cProfile already running\n"
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            return "cProfile started on the Tk thread\n"
+        return self.run_on_main(start)
+
+    def stop_profile(self):
+        def stop():
+            if self.profiler is None: return "cProfile not running\n"
+            self.profiler.disable()
+            report = io.StringIO()
+            pstats.Stats(self.profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            self.profiler = None
+            return report.getvalue()
+        return self.run_on_main(stop)
+
+    def start_tracemalloc(self):
+        if tracemalloc.is_tracing(): return "tracemalloc already running\n"
+        tracemalloc.start()
+        return "tracemalloc started\n"
+
+    def tracemalloc_snapshot(self):
+        if not tracemalloc.is_tracing(): return "tracemalloc not running\n"
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced current={current} peak={peak} bytes"]
+        lines.extend(str(stat) for stat in tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP_LINES])
+        return "\n".join(lines) + "\n"
+
+    def stop_tracemalloc(self):
+        if not tracemalloc.is_tracing(): return "tracemalloc not running\n"
+        tracemalloc.stop()
+        return "tracemalloc stopped\n"
+
+
+class MetricsServer:
+    def __init__(self, registry, profiler_control, bind_address):
+        self.registry = registry
+        self.profiler_control = profiler_control
+        routes = {
+            "/metrics": registry.render_prometheus,
+            "/profile/start": profiler_control.start_profile,
+            "/profile/stop": profiler_control.stop_profile,
+            "/tracemalloc/start": profiler_control.start_tracemalloc,
+            "/tracemalloc/snapshot": profiler_control.tracemalloc_snapshot,
+            "/tracemalloc/stop": profiler_control.stop_tracemalloc,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                route = routes.get(self.path.split("?", 1)[0])
+                if route is None:
+                    self.send_error(404, "Unknown path")
+                    return
+                try:
+                    body = route().encode("utf-8")
+                    status = 200
+                except Exception as e:
+                    body = f"{type(e).__name__}: {e}\n".encode("utf-8")
+                    status = 500
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes every few seconds would flood stdout
+
+        self.server = ThreadingHTTPServer(bind_address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"Metrics available on http://{self.server.server_address[0]}:{self.server.server_address[1]}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
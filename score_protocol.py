@@ -0,0 +1,225 @@
+import struct
+
+# --- Score packet wire format (shared by ScoreSender.py and the scoreboard display) ---
+# Binary frame, network byte order:
+#   magic    2 bytes  b"HP"
+#   version  1 byte   PROTOCOL_VERSION
+#   type     1 byte   MSG_* below, plus ACK_REQUESTED (high bit) if the sender wants an ACK
+#   channel  1 byte   which scoreboard the frame is for (0 = house points; see CHANNELS in test.py)
+#   count    1 byte   number of team scores (or deltas) that follow
+#   sender   4 bytes  random id picked by each sender when it starts
+#   sequence 4 bytes  incremented by the sender for every frame (wraps at 2**32)
+# MSG_FULL_STATE and MSG_STATE_SNAPSHOT payload:
+#   scores   count x 4 bytes, signed, in packet team order
+# MSG_DELTA payload, applied by the display as one atomic change on top of its current scores:
+#   deltas   count x (team index 1 byte, increment 4 bytes signed)
+# Full states replace every score and are dropped if older than the sender's newest (SequenceTracker).
+# Deltas add to whatever the display holds, so concurrent senders don't overwrite each other; they are
+# applied in any order but only once per (sender, sequence) (DuplicateFilter).
+# MSG_ACK has no payload; it is the display's reply to a frame sent with ACK_REQUESTED and carries
+# that frame's sender id and sequence (see reliable_delivery.py).
+# MSG_STATE_REQUEST has no payload; a display sends it to the state service (score_service.py), which
+# answers with an MSG_STATE_SNAPSHOT of its authoritative scores under its own sender id and sequence.
+# The legacy UTF-8 text format "castile:capet:essex:milan" is still accepted by decode_packet.
+
+PROTOCOL_MAGIC = b"HP"
+PROTOCOL_VERSION = 1
+MSG_FULL_STATE = 1
+MSG_DELTA = 2
+MSG_ACK = 3
+MSG_STATE_REQUEST = 4
+MSG_STATE_SNAPSHOT = 5
+ACK_REQUESTED = 0x80
+
+HEADER_STRUCT = struct.Struct("!2sBBBBII")
+MAX_TEAMS = 255
+MAX_CHANNELS = 256
+MAX_DELTAS = 255 # Per frame; larger batches are split by encode_delta_frames
+SEQUENCE_MASK = 0xFFFFFFFF
+SCORE_MIN = -2 ** 31 # Scores are 32-bit signed on the wire and in the score store and history files
+SCORE_MAX = 2 ** 31 - 1
+DUPLICATE_WINDOW = 1024 # Delta frames further than this behind a sender's newest can't be checked and are dropped
+
+_score_structs = {} # team count -> Struct for the score block, built on first use
+_delta_structs = {} # delta count -> Struct for the delta block
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def _scores_struct(count):
+    scores_struct = _score_structs.get(count)
+    if scores_struct is None:
+        scores_struct = _score_structs[count] = struct.Struct(f"!{count}i")
+    return scores_struct
+
+
+def encode_full_state(sender_id, sequence, scores, ack_requested=False, msg_type=MSG_FULL_STATE, channel=0):
+    if not 0 < len(scores) <= MAX_TEAMS:
+        raise ProtocolError(f"Team count must be between 1 and {MAX_TEAMS}")
+    _check_channel(channel)
+    msg_type |= ACK_REQUESTED if ack_requested else 0
+    try:
+        return (HEADER_STRUCT.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, msg_type, channel, len(scores),
+                                   sender_id, sequence & SEQUENCE_MASK)
+                + _scores_struct(len(scores)).pack(*scores))
+    except struct.error as e:
+        raise ProtocolError(f"Scores must be 32-bit integers ({e})")
+
+
+def encode_deltas(sender_id, sequence, deltas, ack_requested=False, channel=0):
+    # deltas: (team index, increment) pairs, at most MAX_DELTAS.
+    if not 0 < len(deltas) <= MAX_DELTAS:
+        raise ProtocolError(f"Delta count must be between 1 and {MAX_DELTAS}")
+    _check_channel(channel)
+    msg_type = MSG_DELTA | (ACK_REQUESTED if ack_requested else 0)
+    try:
+        return (HEADER_STRUCT.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, msg_type, channel, len(deltas),
+                                   sender_id, sequence & SEQUENCE_MASK)
+                + _deltas_struct(len(deltas)).pack(*(value for delta in deltas for value in delta)))
+    except struct.error as e:
+        raise ProtocolError(f"Team index must be 0-{MAX_TEAMS - 1} and increments 32-bit integers ({e})")
+
+
+def encode_delta_frames(sender_id, first_sequence, deltas, ack_requested=False, channel=0):
+    # Any number of deltas as [(sequence, packet), ...], MAX_DELTAS per frame, numbered from first_sequence.
+    frames = []
+    for offset, start in enumerate(range(0, len(deltas), MAX_DELTAS)):
+        sequence = (first_sequence + offset) & SEQUENCE_MASK
+        frames.append((sequence, encode_deltas(sender_id, sequence, deltas[start:start + MAX_DELTAS], ack_requested, channel)))
+    return frames
+
+
+def encode_ack(sender_id, sequence):
+    return HEADER_STRUCT.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, MSG_ACK, 0, 0, sender_id, sequence & SEQUENCE_MASK)
+
+
+def encode_state_request(requester_id, sequence):
+    return HEADER_STRUCT.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, MSG_STATE_REQUEST, 0, 0, requester_id, sequence & SEQUENCE_MASK)
+
+
+def encode_state_snapshot(service_id, sequence, scores):
+    return encode_full_state(service_id, sequence, scores, msg_type=MSG_STATE_SNAPSHOT)
+
+
+def _check_channel(channel):
+    if not 0 <= channel < MAX_CHANNELS:
+        raise ProtocolError(f"Channel must be between 0 and {MAX_CHANNELS - 1}")
+
+
+def packet_channel(data):
+    # Channel byte of a binary frame; legacy text packets always belong to channel 0.
+    return data[4] if len(data) >= HEADER_STRUCT.size and data[:2] == PROTOCOL_MAGIC else 0
+
+
+def ack_requested(data):
+    # True for a binary frame whose sender asked for an ACK; cheap enough to call on every datagram.
+    return len(data) >= HEADER_STRUCT.size and data[:2] == PROTOCOL_MAGIC and bool(data[3] & ACK_REQUESTED)
+
+
+def _deltas_struct(count):
+    deltas_struct = _delta_structs.get(count)
+    if deltas_struct is None:
+        deltas_struct = _delta_structs[count] = struct.Struct("!" + "Bi" * count)
+    return deltas_struct
+
+
+def encode_text_scores(scores):
+    return ":".join(str(int(score)) for score in scores).encode('utf-8')
+
+
+def decode_packet(data):
+    # Returns (msg_type, sender_id, sequence, payload). The payload is the scores for MSG_FULL_STATE and
+    # ((team index, increment), ...) for MSG_DELTA. Text packets have sender_id and sequence None.
+    if data[:2] != PROTOCOL_MAGIC:
+        return _decode_text(data)
+    if len(data) < HEADER_STRUCT.size:
+        raise ProtocolError(f"Truncated header ({len(data)} bytes)")
+    _, version, msg_type, _, count, sender_id, sequence = HEADER_STRUCT.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    msg_type &= ~ACK_REQUESTED
+    if msg_type in (MSG_ACK, MSG_STATE_REQUEST):
+        return msg_type, sender_id, sequence, ()
+    if msg_type == MSG_DELTA:
+        deltas_struct = _deltas_struct(count)
+        if count == 0 or len(data) != HEADER_STRUCT.size + deltas_struct.size:
+            raise ProtocolError(f"Expected {count} deltas, got {len(data) - HEADER_STRUCT.size} payload bytes")
+        values = deltas_struct.unpack_from(data, HEADER_STRUCT.size)
+        return msg_type, sender_id, sequence, tuple(zip(values[0::2], values[1::2]))
+    if msg_type not in (MSG_FULL_STATE, MSG_STATE_SNAPSHOT):
+        raise ProtocolError(f"Unknown message type {msg_type}")
+    scores_struct = _scores_struct(count)
+    if len(data) != HEADER_STRUCT.size + scores_struct.size:
+        raise ProtocolError(f"Expected {count} scores, got {len(data) - HEADER_STRUCT.size} payload bytes")
+    return msg_type, sender_id, sequence, scores_struct.unpack_from(data, HEADER_STRUCT.size)
+
+
+def _decode_text(data):
+    try:
+        parts = data.decode('utf-8').strip().split(':')
+        scores = tuple(int(part) for part in parts)
+    except (UnicodeDecodeError, ValueError):
+        raise ProtocolError(f"Malformed text packet: {data[:64]!r}")
+    if not all(SCORE_MIN <= score <= SCORE_MAX for score in scores): # Same limit as binary frames
+        raise ProtocolError(f"Text packet score outside the 32-bit range: {data[:64]!r}")
+    return MSG_FULL_STATE, None, None, scores
+
+
+class SequenceTracker:
+    # Remembers the newest sequence number seen from each sender so reordered or duplicated
+    # datagrams can be dropped. Comparison uses serial-number arithmetic so wrap-around is fine.
+    def __init__(self):
+        self.last_sequence = {}
+
+    def accept(self, sender_id, sequence):
+        if sender_id is None: # Legacy text packets carry no sequence number
+            return True
+        last = self.last_sequence.get(sender_id)
+        if last is not None and not 0 < ((sequence - last) & SEQUENCE_MASK) < 0x80000000:
+            return False
+        self.last_sequence[sender_id] = sequence
+        return True
+
+
+class DuplicateFilter:
+    # Accepts each (sender, sequence) once. Per sender it keeps the newest sequence plus a bitmask of which
+    # of the DUPLICATE_WINDOW sequences below it have been seen, so late (reordered) frames are still
+    # applied but a duplicated or retransmitted one is not.
+    def __init__(self, window=DUPLICATE_WINDOW):
+        self.window = window
+        self.window_mask = (1 << window) - 1
+        self.seen = {} # sender_id -> (newest sequence, bitmask; bit n = newest - n seen)
+
+    def accept(self, sender_id, sequence):
+        if sender_id is None: return True
+        state = self.seen.get(sender_id)
+        if state is None:
+            self.seen[sender_id] = (sequence, 1)
+            return True
+        newest, seen_bits = state
+        ahead = (sequence - newest) & SEQUENCE_MASK
+        if 0 < ahead < 0x80000000:
+            seen_bits = ((seen_bits << ahead) | 1) & self.window_mask if ahead < self.window else 1
+            self.seen[sender_id] = (sequence, seen_bits)
+            return True
+        behind = (newest - sequence) & SEQUENCE_MASK
+        if behind >= self.window or (seen_bits >> behind) & 1: return False
+        self.seen[sender_id] = (newest, seen_bits | (1 << behind))
+        return True
+
+
+class GapDetector:
+    # Notices frames skipped by a sender (sequence jumps by more than one), which for deltas means this
+    # display has missed an increment and should resynchronise. Reordering can look like a gap too; the
+    # cost of that is one unnecessary state request.
+    def __init__(self):
+        self.highest = {}
+
+    def observe(self, sender_id, sequence):
+        if sender_id is None: return False
+        highest = self.highest.get(sender_id)
+        ahead = None if highest is None else (sequence - highest) & SEQUENCE_MASK
+        if highest is None or 0 < ahead < 0x80000000: self.highest[sender_id] = sequence
+        return ahead is not None and 1 < ahead < 0x80000000
@@ -0,0 +1,87 @@
+import bisect
+import math
+from functools import lru_cache
+
+# --- Ranking and layout helpers for an arbitrary number of teams ---
+# Teams are ordered by points (highest first); ties keep the configured team order, so the tile order
+# is stable. Tied teams share an ordinal using standard competition ranking: 100, 100, 90 -> 1st, 1st, 3rd.
+
+
+def ordinal(number):
+    if 10 <= number % 100 <= 20: suffix = "th"
+    else: suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+@lru_cache(maxsize=16)
+def compute_grid_layout(team_count, screen_width, screen_height, target_tile_aspect=4 / 3):
+    # (columns, rows) for the tiles whose shape is closest to target_tile_aspect, allowing a few empty cells
+    # in the last row (one per five teams, at least one) so a prime team count isn't squeezed into one row:
+    # 7 teams -> 4x2, 11 -> 4x3, 13 -> 5x3. Cached, so it is worked out once per screen size and team count.
+    max_empty_cells = max(1, team_count // 5)
+    best = None
+    for columns in range(1, max(team_count, 1) + 1):
+        rows = math.ceil(team_count / columns)
+        empty_cells = columns * rows - team_count
+        if empty_cells > max_empty_cells: continue
+        tile_aspect = (screen_width / columns) / max(screen_height / rows, 1)
+        score = (abs(math.log(tile_aspect / target_tile_aspect)), empty_cells)
+        if best is None or score < best[0]: best = (score, columns, rows)
+    return best[1], best[2]
+
+
+class IncrementalRanking:
+    # Sorted list of (-points, team index) kept up to date with bisect on each change instead of re-sorting.
+    def __init__(self, team_names):
+        self.team_names = list(team_names)
+        self.team_index = {name: index for index, name in enumerate(self.team_names)}
+        self.points = {}
+        self.keys = []
+
+    def set_points(self, team_name, points):
+        # Returns the (first, last) positions whose team or rank may have changed, or None if nothing did.
+        old_points = self.points.get(team_name)
+        if old_points == points: return None
+        index = self.team_index[team_name]
+        if old_points is None:
+            old_position = len(self.keys) # New teams only shift the tiles from their position onwards
+        else:
+            old_position = bisect.bisect_left(self.keys, (-old_points, index))
+            del self.keys[old_position]
+        new_key = (-points, index)
+        new_position = bisect.bisect_left(self.keys, new_key)
+        self.keys.insert(new_position, new_key)
+        self.points[team_name] = points
+        first = min(old_position, new_position)
+        last = min(max(old_position, new_position), len(self.keys) - 1)
+        # Tiles after `last` keep their place, but a tie group reaching past it (the one at `last`, or the
+        # one this team just left) may now start at a different position, which moves its shared rank.
+        last = bisect.bisect_right(self.keys, (self.keys[last][0], len(self.team_names))) - 1
+        if old_points is not None:
+            last = max(last, bisect.bisect_right(self.keys, (-old_points, len(self.team_names))) - 1)
+        return first, last
+
+    def update(self, points_by_team):
+        # Applies a full score set; returns the union of affected positions or None.
+        changed = None
+        for team_name, points in points_by_team.items():
+            affected = self.set_points(team_name, points)
+            if affected is None: continue
+            changed = affected if changed is None else (min(changed[0], affected[0]), max(changed[1], affected[1]))
+        return changed
+
+    def __len__(self):
+        return len(self.keys)
+
+    def team_at(self, position):
+        return self.team_names[self.keys[position][1]]
+
+    def points_at(self, position):
+        return -self.keys[position][0]
+
+    def rank_at(self, position):
+        # 1-based competition rank: one more than the number of teams with strictly more points.
+        return bisect.bisect_left(self.keys, (self.keys[position][0], -1)) + 1
+
+    def items(self):
+        return [(self.team_names[index], -negative_points) for negative_points, index in self.keys]
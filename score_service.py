@@ -0,0 +1,147 @@
+import argparse
+import random
+import selectors
+import socket
+import threading
+
+import score_protocol
+from score_channels import delta_problem
+from score_store import ScoreStore
+
+# --- Headless score state service ---
+# Holds the authoritative scores so a display that reboots, or notices it missed a delta, can catch up in
+# one round trip instead of waiting for the next send. It applies the same full-state and delta frames
+# the displays do (ScoreSender can list it as one of its targets, or it can join the displays' multicast
+# group) and answers each MSG_STATE_REQUEST with an MSG_STATE_SNAPSHOT carrying its current scores and
+# a sequence number that goes up with every applied change. It holds the house points (channel 0) only;
+# frames for the displays' other boards are acknowledged but not applied.
+#
+#   python score_service.py --port 12347 --state-dir /var/lib/house-points
+#   python score_service.py --multicast-group 239.255.42.99 --multicast-port 12345
+#
+# Displays point STATE_SERVICE_ADDRESS in test.py at it; ScoreSender targets it as "host:12347".
+
+DEFAULT_SERVICE_PORT = 12347
+DEFAULT_TEAM_NAMES = ["castile", "capet", "essex", "milan"] # Must match the displays' packet team order
+RECV_BUFFER_SIZE = 65535
+
+
+class ScoreService:
+    def __init__(self, team_names=DEFAULT_TEAM_NAMES, listen_address=("0.0.0.0", DEFAULT_SERVICE_PORT),
+                 multicast_group=None, multicast_port=None, state_dir=None):
+        self.team_names = list(team_names)
+        self.points = {team_name: 0 for team_name in self.team_names}
+        self.service_id = random.getrandbits(32)
+        self.sequence = 0 # Bumped on every applied change; snapshots carry it
+        self.sequence_tracker = score_protocol.SequenceTracker()
+        self.delta_filter = score_protocol.DuplicateFilter()
+        self.lock = threading.Lock() # apply_frame may also be called by an embedding application's thread
+        self.score_store = None
+        if state_dir:
+            self.score_store = ScoreStore(state_dir, self.team_names)
+            restored = self.score_store.load()
+            if restored: self.points = restored[0]
+            self.score_store.start()
+        self.sockets = [self.open_socket(listen_address)]
+        if multicast_group:
+            self.sockets.append(self.open_socket(("", multicast_port or listen_address[1]), multicast_group))
+        self.stopped = False
+        self.thread = None
+
+    def open_socket(self, address, multicast_group=None):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if multicast_group: sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Shared with displays on the same host
+        sock.bind(address)
+        if multicast_group:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, socket.inet_aton(multicast_group) + socket.inet_aton("0.0.0.0"))
+        print(f"Score service listening on {address[0] or '0.0.0.0'}:{address[1]}" + (f" (group {multicast_group})" if multicast_group else ""))
+        return sock
+
+    def snapshot_packet(self):
+        with self.lock:
+            return score_protocol.encode_state_snapshot(self.service_id, self.sequence, [self.points[name] for name in self.team_names])
+
+    def apply_frame(self, msg_type, sender_id, sequence, payload):
+        # Returns True if the scores changed. Full states and deltas are filtered exactly as a display does.
+        with self.lock:
+            if msg_type == score_protocol.MSG_DELTA:
+                if not self.delta_filter.accept(sender_id, sequence): return False
+                problem = delta_problem(self.team_names, self.points, payload)
+                if problem is not None: # Refused as a whole, like a display does
+                    print(f"WARNING: Delta frame ignored ({problem}): {payload}")
+                    return False
+                for team_index, increment in payload: self.points[self.team_names[team_index]] += increment
+            elif msg_type == score_protocol.MSG_FULL_STATE:
+                if not self.sequence_tracker.accept(sender_id, sequence): return False
+                if len(payload) != len(self.team_names):
+                    print(f"WARNING: Full state with {len(payload)} scores ignored, expected {len(self.team_names)}")
+                    return False
+                self.points = dict(zip(self.team_names, payload))
+            else:
+                return False
+            self.sequence = (self.sequence + 1) & score_protocol.SEQUENCE_MASK
+            if self.score_store: self.score_store.append(self.points)
+            return True
+
+    def handle_datagram(self, sock, data, addr):
+        try:
+            msg_type, sender_id, sequence, payload = score_protocol.decode_packet(data)
+        except score_protocol.ProtocolError as e:
+            print(f"Malformed packet from {addr[0]}: {e}")
+            return
+        if msg_type == score_protocol.MSG_STATE_REQUEST:
+            sock.sendto(self.snapshot_packet(), addr)
+            return
+        if msg_type in (score_protocol.MSG_ACK, score_protocol.MSG_STATE_SNAPSHOT): return
+        if score_protocol.packet_channel(data) == 0 and self.apply_frame(msg_type, sender_id, sequence, payload): print(f"Applied update from {addr[0]}: {self.points} (state seq {self.sequence})")
+        if sender_id is not None and score_protocol.ack_requested(data):
+            sock.sendto(score_protocol.encode_ack(sender_id, sequence), addr)
+
+    def serve_forever(self):
+        selector = selectors.DefaultSelector()
+        for sock in self.sockets: selector.register(sock, selectors.EVENT_READ)
+        try:
+            while not self.stopped:
+                for key, _ in selector.select(timeout=0.5):
+                    try:
+                        data, addr = key.fileobj.recvfrom(RECV_BUFFER_SIZE)
+                        self.handle_datagram(key.fileobj, data, addr)
+                    except OSError as e:
+                        if not self.stopped: print(f"UDP Rx Error: {e}")
+                    except Exception as e: # One datagram must never stop the authoritative service
+                        print(f"ERROR: Failed to handle datagram from {addr[0]}: {type(e).__name__} - {e}")
+        finally:
+            selector.close()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        if self.thread: self.thread.join(timeout=1)
+        for sock in self.sockets: sock.close()
+        if self.score_store: self.score_store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold the authoritative house points and answer display resync requests.")
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVICE_PORT)
+    parser.add_argument("--teams", default=",".join(DEFAULT_TEAM_NAMES), help="comma-separated team names in packet order")
+    parser.add_argument("--multicast-group", help="also receive score packets sent to this group")
+    parser.add_argument("--multicast-port", type=int, default=12345)
+    parser.add_argument("--state-dir", help="persist the scores here across restarts")
+    args = parser.parse_args()
+
+    service = ScoreService(args.teams.split(","), (args.bind, args.port), args.multicast_group, args.multicast_port, args.state_dir)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping score service.")
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from score_protocol import SCORE_MAX, SCORE_MIN
+
+# --- Persistent score state for the scoreboard display ---
+# Every applied score update is appended to an on-disk log, and the log is periodically folded into an
+# atomically replaced snapshot and restarted, so start-up reads one snapshot plus a short log tail no
+# matter how long the board has been running.
+#
+# Both files start with a header naming the teams in the order their scores are stored:
+#   magic 4s, version B, team count B, then for each team: name length B + UTF-8 name
+# followed by records (the snapshot holds exactly one):
+#   record number Q, unix timestamp d, team count B, scores team count x i, CRC32 of the preceding bytes I
+# Record numbers only increase, so log records already covered by the snapshot are skipped on replay;
+# that keeps a crash between writing the snapshot and restarting the log harmless. A torn record at the
+# end of the log (power loss mid-write) fails its CRC and is cut off.
+#
+# Writes happen on a background thread; callers only put updates on a queue.
+
+LOG_MAGIC = b"HPSL"
+SNAPSHOT_MAGIC = b"HPSS"
+STORE_VERSION = 1
+RECORD_HEAD_STRUCT = struct.Struct("!QdB")
+CRC_STRUCT = struct.Struct("!I")
+LOG_FILENAME = "scores.log"
+SNAPSHOT_FILENAME = "scores.snapshot"
+STORE_FLUSH_INTERVAL_S = 0.5 # Updates arriving within this window are written (and fsynced) together
+SNAPSHOT_EVERY_RECORDS = 500
+
+
+def encode_header(magic, team_names):
+    parts = [magic, struct.pack("!BB", STORE_VERSION, len(team_names))]
+    for name in team_names:
+        encoded_name = name.encode("utf-8")
+        parts.append(struct.pack("!B", len(encoded_name)) + encoded_name)
+    return b"".join(parts)
+
+
+def decode_header(data, magic):
+    # Returns (team_names, header_length) or None if the header is missing or damaged.
+    if data[:4] != magic or len(data) < 6: return None
+    version, count = struct.unpack_from("!BB", data, 4)
+    if version != STORE_VERSION: return None
+    offset, names = 6, []
+    for _ in range(count):
+        if offset >= len(data): return None
+        length = data[offset]
+        name = data[offset + 1:offset + 1 + length]
+        if len(name) != length: return None
+        names.append(name.decode("utf-8", "replace"))
+        offset += 1 + length
+    return names, offset
+
+
+def encode_record(record_number, timestamp, scores):
+    body = RECORD_HEAD_STRUCT.pack(record_number, timestamp, len(scores)) + struct.pack(f"!{len(scores)}i", *scores)
+    return body + CRC_STRUCT.pack(zlib.crc32(body))
+
+
+def decode_record(data, offset):
+    # Returns (record_number, timestamp, scores, next_offset) or None at the end of valid data.
+    if offset + RECORD_HEAD_STRUCT.size > len(data): return None
+    record_number, timestamp, count = RECORD_HEAD_STRUCT.unpack_from(data, offset)
+    scores_end = offset + RECORD_HEAD_STRUCT.size + 4 * count
+    if scores_end + CRC_STRUCT.size > len(data): return None
+    (crc,) = CRC_STRUCT.unpack_from(data, scores_end)
+    if crc != zlib.crc32(data[offset:scores_end]): return None
+    scores = struct.unpack_from(f"!{count}i", data, offset + RECORD_HEAD_STRUCT.size)
+    return record_number, timestamp, scores, scores_end + CRC_STRUCT.size
+
+
+def write_file_atomically(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(os.path.dirname(path))
+
+
+def set_aside_file(path):
+    # Renames a state file that can't be used any more instead of overwriting it; returns the new name.
+    kept_path = f"{path}.{time.strftime('%Y%m%d-%H%M%S')}.old"
+    os.replace(path, kept_path)
+    return kept_path
+
+
+def iter_queue_batches(pending, flush_interval_s):
+    # Yields (items, stopping) for everything put on pending within flush_interval_s of the first item, so a
+    # writer thread can handle them in one write. A None item ends the stream after a final (possibly empty) batch.
+    stopping = False
+    while not stopping:
+        batch = [pending.get()]
+        deadline = time.monotonic() + flush_interval_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or batch[-1] is None: break
+            try: batch.append(pending.get(timeout=remaining))
+            except queue.Empty: break
+        if batch[-1] is None:
+            stopping = True
+            batch.pop()
+        yield batch, stopping
+
+
+def fsync_directory(directory):
+    try:
+        directory_fd = os.open(directory or ".", os.O_RDONLY)
+    except (OSError, AttributeError):
+        return # Not supported on Windows
+    try: os.fsync(directory_fd)
+    except OSError: pass
+    finally: os.close(directory_fd)
+
+
+class ScoreStore:
+    def __init__(self, directory, team_names):
+        self.directory = directory
+        self.team_names = list(team_names)
+        self.log_path = os.path.join(directory, LOG_FILENAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILENAME)
+        self.next_record_number = 1
+        self.latest = None # (record_number, timestamp, scores) of the newest state, written or pending
+        self.records_since_snapshot = 0
+        self.pending = queue.Queue()
+        self.log_file = None
+        self.thread = None
+        self.write_errors = 0
+
+    def load(self):
+        # Returns ({team: points}, unix timestamp) for the newest persisted state, or None.
+        os.makedirs(self.directory, exist_ok=True)
+        newest = None
+        snapshot = self._read_file(self.snapshot_path, SNAPSHOT_MAGIC)
+        if snapshot is not None:
+            names, records, _ = snapshot
+            if records: newest = (names,) + records[-1]
+        log = self._read_file(self.log_path, LOG_MAGIC)
+        valid_log_end = 0
+        if log is not None:
+            names, records, valid_log_end = log
+            snapshot_record_number = newest[1] if newest else 0
+            tail = [record for record in records if record[0] > snapshot_record_number]
+            self.records_since_snapshot = len(tail)
+            if tail: newest = (names,) + tail[-1]
+            if names != self.team_names: valid_log_end = 0 # Team order changed; the log restarts below
+        if newest is not None and set(newest[0]) != set(self.team_names):
+            # Checked before the log is restarted, so the saved scores are kept for the old team list rather than lost.
+            print(f"WARNING: Saved scores are for teams {newest[0]}, not {self.team_names}; starting without them")
+            for path in (self.snapshot_path, self.log_path):
+                if os.path.exists(path): print(f"WARNING: Kept {path} as {set_aside_file(path)}")
+            newest = None
+            valid_log_end = 0
+            self.records_since_snapshot = 0
+        self._open_log(valid_log_end)
+        if newest is None: return None
+        names, record_number, timestamp, scores = newest
+        self.next_record_number = record_number + 1
+        points = dict(zip(names, scores))
+        self.latest = (record_number, timestamp, tuple(points[name] for name in self.team_names))
+        if valid_log_end == 0 and self.records_since_snapshot: # The restored state only lived in the discarded log
+            self._write_snapshot_file()
+            self.records_since_snapshot = 0
+        return points, timestamp
+
+    def _read_file(self, path, magic):
+        try:
+            with open(path, "rb") as state_file: data = state_file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"WARNING: Could not read {path}: {e}")
+            return None
+        header = decode_header(data, magic)
+        if header is None:
+            print(f"WARNING: {path} has no valid header, ignoring it")
+            return None
+        names, offset = header
+        records = []
+        while True:
+            record = decode_record(data, offset)
+            if record is None: break
+            records.append(record[:3])
+            offset = record[3]
+        if offset < len(data): print(f"WARNING: Discarding {len(data) - offset} damaged bytes at the end of {path}")
+        return names, records, offset
+
+    def _open_log(self, valid_end):
+        # Keeps the valid part of an existing log (dropping a torn tail) or starts a new one.
+        if valid_end > 0:
+            self.log_file = open(self.log_path, "r+b")
+            self.log_file.truncate(valid_end)
+            self.log_file.seek(valid_end)
+        else:
+            write_file_atomically(self.log_path, encode_header(LOG_MAGIC, self.team_names))
+            self.log_file = open(self.log_path, "ab")
+
+    def start(self):
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def append(self, points, timestamp=None):
+        # Called from the Tk thread; never touches the disk. False (and nothing stored) if a score doesn't fit a record.
+        scores = tuple(points[name] for name in self.team_names)
+        if not all(SCORE_MIN <= score <= SCORE_MAX for score in scores):
+            print(f"WARNING: Not persisting scores outside the 32-bit range: {scores}")
+            return False
+        self.pending.put((time.time() if timestamp is None else timestamp, scores))
+        return True
+
+    def close(self):
+        if self.thread is None: return
+        self.pending.put(None)
+        self.thread.join(timeout=5)
+        self.thread = None
+
+    def _writer(self):
+        for batch, stopping in iter_queue_batches(self.pending, STORE_FLUSH_INTERVAL_S):
+            try:
+                self._write_batch(batch)
+                if stopping or self.records_since_snapshot >= SNAPSHOT_EVERY_RECORDS:
+                    self._write_snapshot()
+            except (OSError, struct.error, ValueError) as e: # One bad batch mustn't stop the writer for the rest of the run
+                self.write_errors += 1
+                print(f"WARNING: Could not persist scores: {e}")
+        if self.log_file: self.log_file.close()
+
+    def _write_batch(self, batch):
+        if not batch: return
+        chunks = []
+        for timestamp, scores in batch:
+            try:
+                chunks.append(encode_record(self.next_record_number, timestamp, scores))
+            except struct.error as e: # Skipped on its own, so the rest of the batch is still written
+                self.write_errors += 1
+                print(f"WARNING: Could not persist scores {scores}: {e}")
+                continue
+            self.latest = (self.next_record_number, timestamp, scores)
+            self.next_record_number += 1
+        if not chunks: return
+        self.log_file.write(b"".join(chunks))
+        self.log_file.flush()
+        os.fsync(self.log_file.fileno())
+        self.records_since_snapshot += len(chunks)
+
+    def _write_snapshot(self):
+        if self.latest is None or self.records_since_snapshot == 0: return
+        self._write_snapshot_file()
+        # The snapshot now covers every logged record, so the log can restart empty.
+        self.log_file.close()
+        self.log_file = None
+        self._open_log(0)
+        self.records_since_snapshot = 0
+
+    def _write_snapshot_file(self):
+        record_number, timestamp, scores = self.latest
+        write_file_atomically(self.snapshot_path, encode_header(SNAPSHOT_MAGIC, self.team_names) + encode_record(record_number, timestamp, scores))
@@ -1,34 +1,92 @@
+import time
+STARTUP_TIME = time.monotonic() # Taken before the other imports so time-to-first-frame includes them
 import tkinter as tk
 from tkinter import font
 import socket
 import threading
-import time
 from datetime import datetime
 import queue 
+import selectors
 import os 
 import random # For initial random direction
+import score_protocol
+from image_cache import ImageCache
+from tick_scheduler import TickScheduler
+from score_metrics import MetricsRegistry, MetricsServer, ProfilerControl
+from score_store import ScoreStore
+from score_history import ScoreHistory
+from packet_capture import PacketCapture
+from score_ranking import compute_grid_layout, ordinal
+from score_channels import build_channels
 
 # --- Configuration ---
 UDP_IP = "0.0.0.0"
 UDP_PORT = 12345
-TEAM_NAMES_ORDERED_IN_PACKET = ["castile", "capet", "essex", "milan"]
-
-INITIAL_POINTS = { "castile": 10, "capet": 25, "essex": 5, "milan": 15 }
-UPDATE_INTERVAL_MS = 100
+UDP_LISTEN_ADDRESSES = [(UDP_IP, UDP_PORT)] # Add (interface IP, port) pairs to listen on several ports/interfaces
+UDP_MULTICAST_GROUP = None # e.g. "239.255.42.99" to also receive score packets ScoreSender sends to that group
+UDP_MULTICAST_PORT = UDP_PORT
+UDP_MULTICAST_INTERFACE = "0.0.0.0" # Local interface IP used to join the group ("0.0.0.0" lets the kernel choose)
+UDP_RECV_BUFFER_SIZE = 65535
+UDP_MAX_BATCH = 64 # Max datagrams read from one socket per wakeup before servicing the others
+STATE_SERVICE_ADDRESS = None # e.g. ("192.168.1.10", 12347): score_service.py to resync from at startup and after missed deltas
+STATE_REQUEST_RETRY_S = 2 # Startup state requests are repeated this often until a snapshot arrives
+STATE_REQUEST_ATTEMPTS = 3
+RESYNC_MIN_INTERVAL_S = 2 # At most one gap-triggered state request per interval
+TEAM_NAMES_ORDERED_IN_PACKET = ["castile", "capet", "essex", "milan"] # Any number of teams; the tile grid adapts
+
+INITIAL_POINTS = { "castile": 10, "capet": 25, "essex": 5, "milan": 15 } # Teams not listed start at 0
+CHANNELS = { # Boards this display serves, keyed by the channel byte of the packet header (see score_channels.py)
+    0: {"title": "House Points", "teams": TEAM_NAMES_ORDERED_IN_PACKET, "initial_points": INITIAL_POINTS},
+    # 1: {"title": "Sports Day", "teams": ["red", "blue", "green", "yellow"]},
+    # 2: {"title": "Quiz", "teams": ["7a", "7b", "8a", "8b", "9a", "9b"]},
+}
+HOUSE_POINTS_CHANNEL = 0 # The channel that is persisted, kept in the history and resynced from STATE_SERVICE_ADDRESS
+CHANNEL_ROTATION_MS = 30 * 1000 # With several channels, each is shown this long in turn (0 = stay on the first)
+TEAM_COLOR_PALETTE = ["#24593f", "#2c3f8b", "#9a4996", "#c13734", "#b5651d", "#1f7a8c", "#6b8e23", "#8b4513", "#4b0082", "#2f4f4f", "#a0522d", "#556b2f"] # For teams without their own colour
+UPDATE_INTERVAL_MS = 100 # Queue polling interval, only used where Tk has no createfilehandler (Windows)
 TEMP_FULLSCREEN_DURATION_MS = 10000 
 QUADRANT_SEPARATOR_THICKNESS = 1 
+PRINT_RENDER_TIMING = False # Print per-update render time (ms) to stdout for profiling on the Pi
+PRINT_SCHEDULER_STATS = False # Print per-timer run time and lateness statistics on exit
+METRICS_ENABLED = True # Prometheus metrics and profiling toggles over HTTP (see score_metrics.py)
+METRICS_BIND_ADDRESS = ("127.0.0.1", 9105) # Use ("0.0.0.0", 9105) to scrape from another machine
+MAIN_THREAD_CALL_TIMEOUT_S = 5
 
 # --- Image Paths ---
 IMAGE_BASE_PATH = "/home/ssa/House-Point-System/" 
 TROPHY_ICON_PATH = os.path.join(IMAGE_BASE_PATH, "trophy.png")
 LOGO_FOR_SCREENSAVER_PATH = os.path.join(IMAGE_BASE_PATH, "logo.png") # Path for the bouncing logo
+EMBLEM_MAX_SCREEN_HEIGHT_FRACTION = 0.4 # Larger team emblems are subsampled to fit the fullscreen view
+IMAGE_DISK_CACHE_ENABLED = True # Keep images pre-converted/pre-scaled for fast loading (see image_cache.py)
+IMAGE_DISK_CACHE_DIRNAME = "image_cache" # Inside STATE_DIR
+STARTUP_WARMUP_STEP_MS = 50 # Gap between the deferred startup steps, so UDP updates are handled in between
+
+# --- Score Persistence ---
+STATE_PERSISTENCE_ENABLED = True # Keep the last received scores across restarts (see score_store.py)
+STATE_DIR = os.path.join(IMAGE_BASE_PATH, "state")
+HISTORY_ENABLED = True # Per-team score history for the trend line in the fullscreen view (see score_history.py)
+HISTORY_FILENAME = "history.bin"
+TREND_DAYS = 120 # Roughly one term
+TREND_WIDTH_PX = 600
+TREND_HEIGHT_PX = 120
+
+# --- Packet Capture ---
+CAPTURE_ENABLED = False # Record every received datagram for capture_replay.py (see packet_capture.py)
+CAPTURE_DIRNAME = "captures" # Inside STATE_DIR; one file per run
+CAPTURE_MAX_BYTES = 256 * 1024 * 1024 # Recording stops at this size so a packet flood can't fill the SD card
 
 # --- Burn-in Prevention Configuration ---
 # BURN_IN_MESSAGE REMOVED
 BURN_IN_SCREEN_DURATION_MS = 20 * 60 * 1000  # 2 minutes
-BURN_IN_LOGO_DX = 3  # Pixels to move logo horizontally each step
-BURN_IN_LOGO_DY = 2  # Pixels to move logo vertically each step
-BURN_IN_ANIMATION_DELAY_MS = 25 # Milliseconds between animation steps (faster for smoother bounce)
+BURN_IN_MODE = "logo" # "logo" for the bouncing logo screensaver, "pixel_shift" to keep the scores visible and slowly shift the board
+BURN_IN_LOGO_SPEED_X = 120  # Pixels per second the logo moves horizontally
+BURN_IN_LOGO_SPEED_Y = 80   # Pixels per second the logo moves vertically
+BURN_IN_TARGET_FPS = 40 # Animation frame rate (smoother bounce)
+BURN_IN_LOW_POWER_FPS = 10 # Frame rate used while the CPU is loaded
+BURN_IN_LOW_POWER_LOAD = 0.75 # 1-minute load average per CPU above which the low-power frame rate is used
+BURN_IN_LOAD_CHECK_INTERVAL_S = 5
+BURN_IN_PIXEL_SHIFT_MAX_PX = 4 # pixel_shift mode: maximum board offset in each direction; the board visits the corners, edge midpoints and centre of this square
+BURN_IN_PIXEL_SHIFT_INTERVAL_MS = 30 * 1000
 
 class ScoreboardApp:
     def __init__(self, root):
@@ -37,69 +95,203 @@ class ScoreboardApp:
         self.root.attributes('-fullscreen', True)
         self.root.config(cursor="none")
 
-        self.team_points = INITIAL_POINTS.copy()
+        self.channels = build_channels(CHANNELS)
+        self.house_channel = self.channels.get(HOUSE_POINTS_CHANNEL)
         self.sorted_teams_cache = []
-        self.last_update_time = "Never"
+        self.rank_gaps = {}
+        self.team_rank_strings = {}
+        self.fs_window_visible = False
+        self.fs_window_close_task = None
+        self.fs_grab_task = None
+        self.render_count = 0
+        self.render_time_total_s = 0.0
+        self.render_time_max_s = 0.0
+        self.score_store = None
+        if STATE_PERSISTENCE_ENABLED and self.house_channel: self.restore_persisted_scores()
+        self.score_history = None
+        if HISTORY_ENABLED and self.house_channel: self.open_score_history()
+        self.packet_capture = None
+        if CAPTURE_ENABLED: self.open_packet_capture()
+        # The channel on screen; self.team_points and self.ranking are its state, the renderer's inputs.
+        self.channel = next(iter(self.channels.values()))
+        self.team_points = self.channel.team_points
+        self.ranking = self.channel.ranking
+        self.channel_rotation_task = None
 
         self.team_colors = { 
             "castile": "#24593f", "capet":   "#2c3f8b",
             "essex":   "#9a4996", "milan":   "#c13734" 
         }
+        for channel in self.channels.values():
+            for team_index, team_name in enumerate(channel.team_names):
+                self.team_colors.setdefault(team_name, TEAM_COLOR_PALETTE[team_index % len(TEAM_COLOR_PALETTE)])
         self.trophy_icon_image = None 
         self.screensaver_logo_image = None # For the PhotoImage of the bouncing logo
         
         # For burn-in prevention screen
         self.burn_in_screen_active = False
         self.burn_in_window = None
-        self.burn_in_logo_label = None # Will display the logo
-        self.burn_in_animation_id = None
-        self.burn_in_logo_x = 0
-        self.burn_in_logo_y = 0
-        self.burn_in_logo_dx_current = BURN_IN_LOGO_DX
-        self.burn_in_logo_dy_current = BURN_IN_LOGO_DY
-
-
-        try:
-            if not os.path.exists(TROPHY_ICON_PATH):
-                print(f"WARNING: Trophy icon file not found at {TROPHY_ICON_PATH}")
-            else:
-                self.trophy_icon_image = tk.PhotoImage(file=TROPHY_ICON_PATH)
-        except Exception as e:
-            print(f"WARNING: ERROR loading trophy icon: {e}")
-            self.trophy_icon_image = None
-        
-        try:
-            if not os.path.exists(LOGO_FOR_SCREENSAVER_PATH):
-                print(f"WARNING: Screensaver logo file not found at {LOGO_FOR_SCREENSAVER_PATH}")
-            else:
-                self.screensaver_logo_image = tk.PhotoImage(file=LOGO_FOR_SCREENSAVER_PATH)
-        except Exception as e:
-            print(f"WARNING: ERROR loading screensaver logo: {e}")
-            self.screensaver_logo_image = None
+        self.burn_in_canvas = None # Canvas the logo item is drawn on
+        self.burn_in_logo_item = None
+        self.burn_in_animation_task = None
+        self.burn_in_end_task = None
+        self.burn_in_logo_x = 0.0
+        self.burn_in_logo_y = 0.0
+        self.burn_in_logo_vx = BURN_IN_LOGO_SPEED_X
+        self.burn_in_logo_vy = BURN_IN_LOGO_SPEED_Y
+
+
+        # Only the trophy is needed for the first frame. The emblems, screensaver logo and fullscreen view are
+        # prepared in idle time after it (run_startup_warmup_step), or on demand if they are needed sooner.
+        self.image_cache = ImageCache(self.root, disk_cache_dir=os.path.join(STATE_DIR, IMAGE_DISK_CACHE_DIRNAME) if IMAGE_DISK_CACHE_ENABLED else None)
+        self.emblem_max_size = (self.root.winfo_screenwidth(), int(self.root.winfo_screenheight() * EMBLEM_MAX_SCREEN_HEIGHT_FRACTION))
+        self.trophy_icon_image = self.image_cache.get(TROPHY_ICON_PATH)
+        self.fs_window = None
+        self.time_to_first_frame_s = None
+        self.startup_warmup_steps = [self.build_fullscreen_view, self.load_screensaver_logo]
+        self.startup_warmup_steps += [lambda team_name=team_name: self.team_emblem_image(team_name) for team_name in self.channel.team_names]
+        self.startup_warmup_task = None
 
 
         self.udp_queue = queue.Queue()
+        self.delta_filter = score_protocol.DuplicateFilter() # Deltas: each (sender, sequence) applied once; senders number frames across channels
+        self.gap_detector = score_protocol.GapDetector() # Missed deltas trigger a resync from STATE_SERVICE_ADDRESS
+        self.state_requester_id = random.getrandbits(32)
+        self.state_request_sequence = 0
+        self.last_state_request_time = None
+        self.state_snapshot_received = False
         self.udp_stop_event = threading.Event()
+        self.udp_shutdown_read_sock, self.udp_shutdown_write_sock = socket.socketpair() # Wakes the listener on close; sockets, as select() on Windows takes nothing else
         self.udp_thread = threading.Thread(target=self.udp_listener, daemon=True)
 
+        self.udp_poll_task = None
+        self.tk_calls = queue.Queue() # (function, done event, outcome dict) queued by call_in_tk_thread
+        self.scheduler = TickScheduler(self.root) # Owns every timer below; one Tk `after` pending at a time
+        self.setup_metrics()
+
+        self.quadrant_container = None
+        self.scoreboard_offset = None # (x, y) while pixel_shift burn-in prevention is active
         self.setup_ui()
+        if len(self.channels) > 1 and CHANNEL_ROTATION_MS > 0:
+            self.channel_rotation_task = self.scheduler.call_every(CHANNEL_ROTATION_MS, self.show_next_channel, name="channel_rotation")
+        self.setup_udp_wakeup()
+        self.start_metrics_server()
         self.udp_thread.start()
-        self.process_udp_queue()
+        if self.udp_wakeup_enabled: self.process_udp_queue()
+        else: self.udp_poll_task = self.scheduler.call_every(UPDATE_INTERVAL_MS, self.process_wakeup) # Fallback for platforms without createfilehandler
 
         self.root.bind("<FocusIn>", self.reassert_fullscreen_root)
         self.root.bind("<Activate>", self.reassert_fullscreen_root)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.bind('<Escape>', lambda e: self.on_closing())
         
-        self.check_burn_in_schedule_id = self.root.after(1000, self.check_burn_in_schedule)
-
+        self.check_burn_in_schedule_task = self.scheduler.call_later(1000, self.check_burn_in_schedule)
+
+    def on_first_frame(self, event):
+        # One-shot <Expose> of the quadrant container (bound in build_quadrant_grid): the board is mapped and drawn.
+        event.widget.unbind("<Expose>")
+        if self.time_to_first_frame_s is not None: return
+        self.time_to_first_frame_s = time.monotonic() - STARTUP_TIME
+        self.metric_time_to_first_frame.set(self.time_to_first_frame_s)
+        print(f"Startup: first frame after {self.time_to_first_frame_s * 1000:.0f} ms")
+        self.startup_warmup_task = self.scheduler.call_later(STARTUP_WARMUP_STEP_MS, self.run_startup_warmup_step, name="startup_warmup")
+
+    def run_startup_warmup_step(self):
+        # One deferred startup job per tick, so a packet arriving meanwhile is shown without waiting for all of them.
+        self.startup_warmup_task = None
+        if not self.startup_warmup_steps: return
+        self.startup_warmup_steps.pop(0)()
+        if self.startup_warmup_steps:
+            self.startup_warmup_task = self.scheduler.call_later(STARTUP_WARMUP_STEP_MS, self.run_startup_warmup_step, name="startup_warmup")
+
+    def load_screensaver_logo(self):
+        if self.screensaver_logo_image is None: self.screensaver_logo_image = self.image_cache.get(LOGO_FOR_SCREENSAVER_PATH)
+        return self.screensaver_logo_image
+
+
+    def restore_persisted_scores(self):
+        # Shows the last scores received before a restart instead of INITIAL_POINTS.
+        try:
+            self.score_store = ScoreStore(STATE_DIR, self.house_channel.team_names)
+            restored = self.score_store.load()
+        except OSError as e:
+            print(f"WARNING: Score persistence disabled, cannot use {STATE_DIR}: {e}")
+            self.score_store = None
+            return
+        if restored:
+            self.house_channel.team_points, timestamp = restored
+            self.house_channel.last_update_time = ScoreboardApp.format_update_time(datetime.fromtimestamp(timestamp))
+            print(f"Restored scores from {STATE_DIR}: {self.house_channel.team_points}")
+        self.score_store.start()
+
+    def open_score_history(self):
+        history_path = os.path.join(STATE_DIR, HISTORY_FILENAME)
+        try:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            self.score_history = ScoreHistory(history_path, len(self.house_channel.team_names))
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Score history disabled, cannot use {history_path}: {e}")
+            self.score_history = None
+
+    def open_packet_capture(self):
+        capture_path = os.path.join(STATE_DIR, CAPTURE_DIRNAME, f"capture-{datetime.now():%Y%m%d-%H%M%S}.hpcap")
+        try:
+            self.packet_capture = PacketCapture(capture_path, CAPTURE_MAX_BYTES)
+        except OSError as e:
+            print(f"WARNING: Packet capture disabled, cannot write {capture_path}: {e}")
+            return
+        self.packet_capture.start()
+        print(f"Recording received datagrams to {capture_path}")
+
+    def setup_metrics(self):
+        self.metrics = MetricsRegistry()
+        self.metric_packets_received = self.metrics.counter("scoreboard_packets_received_total", "UDP datagrams received")
+        self.metric_packets_accepted = self.metrics.counter("scoreboard_packets_accepted_total", "Score packets applied to the board")
+        self.metric_packets_malformed = self.metrics.counter("scoreboard_packets_malformed_total", "Datagrams that could not be decoded")
+        self.metric_packets_stale = self.metrics.counter("scoreboard_packets_stale_total", "Frames dropped for an old sequence number")
+        self.metric_state_requests = self.metrics.counter("scoreboard_state_requests_total", "Resync requests sent to the state service")
+        self.metric_acks_sent = self.metrics.counter("scoreboard_acks_sent_total", "ACKs sent to senders in reliable mode")
+        self.metric_packets_unknown_channel = self.metrics.counter("scoreboard_packets_unknown_channel_total", "Frames for a channel not in CHANNELS")
+        self.metric_packets_duplicate = self.metrics.counter("scoreboard_packets_duplicate_total", "Delta frames dropped as already applied")
+        self.metric_packets_coalesced = self.metrics.counter("scoreboard_packets_coalesced_total", "Accepted packets superseded before being rendered")
+        self.metrics.gauge("scoreboard_udp_queue_depth", "Messages waiting for the Tk thread", self.udp_queue.qsize)
+        self.metric_time_to_first_frame = self.metrics.gauge("scoreboard_time_to_first_frame_seconds", "Process start to the first scoreboard frame")
+        self.metric_render_time = self.metrics.histogram("scoreboard_render_seconds", "update_display duration")
+        self.metric_packet_to_render = self.metrics.histogram("scoreboard_packet_to_render_seconds", "Time from datagram receipt to render")
+        self.metrics.add_collector(self.collect_timer_metrics)
+        self.metrics_server = None
+
+    def start_metrics_server(self):
+        # Started after the wakeup pipe exists, since profiling requests are handed to the Tk thread through it.
+        if not METRICS_ENABLED: return
+        try:
+            self.metrics_server = MetricsServer(self.metrics, ProfilerControl(self.call_in_tk_thread), METRICS_BIND_ADDRESS)
+            self.metrics_server.start()
+        except OSError as e:
+            print(f"WARNING: Metrics endpoint unavailable on {METRICS_BIND_ADDRESS[0]}:{METRICS_BIND_ADDRESS[1]}: {e}")
+
+    def collect_timer_metrics(self):
+        # Tick scheduler per-task stats, read from the metrics thread at scrape time.
+        timer_stats = list(self.scheduler.stats().items())
+        return [
+            ("scoreboard_timer_runs_total", "counter", "Scheduled task runs", [(f'{{task="{name}"}}', stats["runs"]) for name, stats in timer_stats]),
+            ("scoreboard_timer_late_runs_total", "counter", "Periodic task runs skipped to resynchronise", [(f'{{task="{name}"}}', stats["late_runs"]) for name, stats in timer_stats]),
+            ("scoreboard_timer_run_ms_max", "gauge", "Longest task run time (ms)", [(f'{{task="{name}"}}', stats["run_ms_max"]) for name, stats in timer_stats]),
+            ("scoreboard_timer_lateness_ms_max", "gauge", "Worst timer lateness (ms)", [(f'{{task="{name}"}}', stats["lateness_ms_max"]) for name, stats in timer_stats]),
+            ("scoreboard_timer_wakeups_total", "counter", "Tk timer wakeups of the scheduler (several due tasks share one)", [("", self.scheduler.wakeups)]),
+            ("scoreboard_image_cache_hits_total", "counter", "Image cache hits", [("", self.image_cache.hits)]),
+            ("scoreboard_image_cache_misses_total", "counter", "Image cache misses (decodes)", [("", self.image_cache.misses)]),
+        ] + ([
+            ("scoreboard_capture_recorded_total", "counter", "Datagrams written to the packet capture", [("", self.packet_capture.recorded)]),
+            ("scoreboard_capture_dropped_total", "counter", "Datagrams not captured because the writer fell behind or the size limit was reached", [("", self.packet_capture.dropped)]),
+        ] if self.packet_capture else [])
 
     def reassert_fullscreen_root(self, event=None):
         if self.root.attributes('-fullscreen'):
             self.root.attributes('-fullscreen', True); self.root.lift()
 
     def reassert_fullscreen_fs(self, event=None):
-        if hasattr(self, 'fs_window') and self.fs_window.winfo_exists():
+        if self.fs_window_visible:
             if self.fs_window.attributes('-fullscreen'):
                 self.fs_window.attributes('-fullscreen', True); self.fs_window.lift()
 
@@ -111,11 +303,19 @@ class ScoreboardApp:
         
         ms_until_next_minute = (60 - now.second) * 1000 - now.microsecond // 1000
         if ms_until_next_minute < 500: ms_until_next_minute += 60000
-        self.check_burn_in_schedule_id = self.root.after(ms_until_next_minute, self.check_burn_in_schedule)
+        self.check_burn_in_schedule_task = self.scheduler.call_later(ms_until_next_minute, self.check_burn_in_schedule)
 
     def activate_burn_in_screen(self):
         if self.burn_in_screen_active: return
-        if not self.screensaver_logo_image: # Don't activate if logo isn't loaded
+        if BURN_IN_MODE == "pixel_shift":
+            self.activate_pixel_shift()
+        else:
+            self.activate_bouncing_logo()
+        if self.burn_in_screen_active:
+            self.burn_in_end_task = self.scheduler.call_later(BURN_IN_SCREEN_DURATION_MS, self.deactivate_burn_in_screen)
+
+    def activate_bouncing_logo(self):
+        if not self.load_screensaver_logo(): # Don't activate if logo isn't loaded
             print("WARNING: Screensaver logo not loaded, cannot activate burn-in screen.")
             return
             
@@ -127,63 +327,113 @@ class ScoreboardApp:
         self.burn_in_window.configure(bg="black", cursor="none")
         self.burn_in_window.lift()
 
-        self.burn_in_logo_label = tk.Label(
-            self.burn_in_window, 
-            image=self.screensaver_logo_image,
-            bg="black" # Match window background for seamless look
-        )
-        self.burn_in_logo_label.image = self.screensaver_logo_image # Keep reference
-
-        self.burn_in_window.update_idletasks() # Ensure window dimensions are known
-        # Initial position (e.g., center or random within bounds)
-        self.burn_in_logo_x = random.randint(0, self.burn_in_window.winfo_width() - self.screensaver_logo_image.width())
-        self.burn_in_logo_y = random.randint(0, self.burn_in_window.winfo_height() - self.screensaver_logo_image.height())
-        
-        # Initial random direction
-        self.burn_in_logo_dx_current = random.choice([-BURN_IN_LOGO_DX, BURN_IN_LOGO_DX])
-        self.burn_in_logo_dy_current = random.choice([-BURN_IN_LOGO_DY, BURN_IN_LOGO_DY])
-
-        self.burn_in_logo_label.place(x=self.burn_in_logo_x, y=self.burn_in_logo_y)
-        
-        self.animate_bouncing_logo()
-
+        # Geometry is cached here and refreshed only on <Configure>, never queried per frame.
+        self.burn_in_bounds = (self.burn_in_window.winfo_screenwidth(), self.burn_in_window.winfo_screenheight())
+        self.burn_in_logo_size = (self.screensaver_logo_image.width(), self.screensaver_logo_image.height())
+        self.burn_in_canvas = tk.Canvas(self.burn_in_window, bg="black", highlightthickness=0, cursor="none")
+        self.burn_in_canvas.pack(fill=tk.BOTH, expand=True)
+        self.burn_in_canvas.bind("<Configure>", self.on_burn_in_canvas_configure)
+
+        # Initial position (random within bounds) and random direction
+        self.burn_in_logo_x = random.randint(0, max(0, self.burn_in_bounds[0] - self.burn_in_logo_size[0]))
+        self.burn_in_logo_y = random.randint(0, max(0, self.burn_in_bounds[1] - self.burn_in_logo_size[1]))
+        self.burn_in_logo_vx = random.choice([-BURN_IN_LOGO_SPEED_X, BURN_IN_LOGO_SPEED_X])
+        self.burn_in_logo_vy = random.choice([-BURN_IN_LOGO_SPEED_Y, BURN_IN_LOGO_SPEED_Y])
+        self.burn_in_logo_item = self.burn_in_canvas.create_image(
+            int(self.burn_in_logo_x), int(self.burn_in_logo_y), image=self.screensaver_logo_image, anchor="nw")
+
+        self.burn_in_canvas.bind("<Button-1>", self.deactivate_burn_in_screen_event)
         self.burn_in_window.bind("<Button-1>", self.deactivate_burn_in_screen_event)
         self.burn_in_window.bind("<Key>", self.deactivate_burn_in_screen_event)
         self.burn_in_window.focus_set()
 
-        self.root.after(BURN_IN_SCREEN_DURATION_MS, self.deactivate_burn_in_screen)
+        # The scheduler paces frames against absolute deadlines, so timer drift doesn't accumulate.
+        self.burn_in_fps = BURN_IN_TARGET_FPS
+        self.burn_in_next_load_check = time.monotonic() + BURN_IN_LOAD_CHECK_INTERVAL_S
+        self.burn_in_last_frame_time = time.monotonic()
+        self.burn_in_animation_task = self.scheduler.call_every(1000 // BURN_IN_TARGET_FPS, self.animate_bouncing_logo, first_delay_ms=0)
+        self.burn_in_late_frames_seen = self.burn_in_animation_task.stats.late_runs
+
+    def on_burn_in_canvas_configure(self, event):
+        self.burn_in_bounds = (event.width, event.height)
 
     def animate_bouncing_logo(self):
-        if not self.burn_in_screen_active or not self.burn_in_window.winfo_exists() or not self.burn_in_logo_label:
+        if not self.burn_in_screen_active or self.burn_in_canvas is None:
             return
 
-        window_width = self.burn_in_window.winfo_width()
-        window_height = self.burn_in_window.winfo_height()
-        logo_width = self.screensaver_logo_image.width()
-        logo_height = self.screensaver_logo_image.height()
+        now = time.monotonic()
+        elapsed_s = min(now - self.burn_in_last_frame_time, 0.25) # Movement is time-based, so a late frame doesn't slow the logo
+        self.burn_in_last_frame_time = now
+        window_width, window_height = self.burn_in_bounds
+        logo_width, logo_height = self.burn_in_logo_size
 
         # Update position
-        self.burn_in_logo_x += self.burn_in_logo_dx_current
-        self.burn_in_logo_y += self.burn_in_logo_dy_current
+        self.burn_in_logo_x += self.burn_in_logo_vx * elapsed_s
+        self.burn_in_logo_y += self.burn_in_logo_vy * elapsed_s
         
         # Bounce off edges
         if self.burn_in_logo_x + logo_width > window_width:
             self.burn_in_logo_x = window_width - logo_width
-            self.burn_in_logo_dx_current *= -1
+            self.burn_in_logo_vx = -abs(self.burn_in_logo_vx)
         elif self.burn_in_logo_x < 0:
             self.burn_in_logo_x = 0
-            self.burn_in_logo_dx_current *= -1
+            self.burn_in_logo_vx = abs(self.burn_in_logo_vx)
             
         if self.burn_in_logo_y + logo_height > window_height:
             self.burn_in_logo_y = window_height - logo_height
-            self.burn_in_logo_dy_current *= -1
+            self.burn_in_logo_vy = -abs(self.burn_in_logo_vy)
         elif self.burn_in_logo_y < 0:
             self.burn_in_logo_y = 0
-            self.burn_in_logo_dy_current *= -1
-        
-        self.burn_in_logo_label.place_configure(x=self.burn_in_logo_x, y=self.burn_in_logo_y)
+            self.burn_in_logo_vy = abs(self.burn_in_logo_vy)
         
-        self.burn_in_animation_id = self.burn_in_window.after(BURN_IN_ANIMATION_DELAY_MS, self.animate_bouncing_logo)
+        self.burn_in_canvas.coords(self.burn_in_logo_item, int(self.burn_in_logo_x), int(self.burn_in_logo_y))
+        if now >= self.burn_in_next_load_check:
+            self.update_burn_in_frame_rate()
+            self.burn_in_next_load_check = now + BURN_IN_LOAD_CHECK_INTERVAL_S
+
+    def update_burn_in_frame_rate(self):
+        # Low-power mode: drop to BURN_IN_LOW_POWER_FPS while the CPU is busy or frames keep missing their deadline.
+        try:
+            load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError): # getloadavg is not available on Windows
+            load_per_cpu = 0.0
+        # Frames the scheduler had to skip to resynchronise since the last check
+        late_frames = self.burn_in_animation_task.stats.late_runs - self.burn_in_late_frames_seen
+        self.burn_in_late_frames_seen = self.burn_in_animation_task.stats.late_runs
+        expected_frames = BURN_IN_LOAD_CHECK_INTERVAL_S * self.burn_in_fps
+        frames_missed = late_frames > expected_frames * 0.25
+        target_fps = BURN_IN_LOW_POWER_FPS if (load_per_cpu > BURN_IN_LOW_POWER_LOAD or frames_missed) else BURN_IN_TARGET_FPS
+        if target_fps != self.burn_in_fps:
+            print(f"INFO: Burn-in animation now at {target_fps} fps (load per CPU {load_per_cpu:.2f}, missed frames: {frames_missed})")
+            self.burn_in_fps = target_fps
+            self.burn_in_animation_task.set_interval_ms(1000 // target_fps)
+
+    def activate_pixel_shift(self):
+        # Keeps the live scoreboard visible and moves the whole board a few pixels every BURN_IN_PIXEL_SHIFT_INTERVAL_MS.
+        print("INFO: Activating pixel-shift burn-in prevention.")
+        self.burn_in_screen_active = True
+        self.pixel_shift_step = 0
+        self.pixel_shift_path = ScoreboardApp.get_pixel_shift_path(BURN_IN_PIXEL_SHIFT_MAX_PX)
+        self.burn_in_animation_task = self.scheduler.call_every(BURN_IN_PIXEL_SHIFT_INTERVAL_MS, self.shift_scoreboard_pixels, first_delay_ms=0)
+
+    def shift_scoreboard_pixels(self):
+        if not self.burn_in_screen_active: return
+        offset_x, offset_y = self.pixel_shift_path[self.pixel_shift_step % len(self.pixel_shift_path)]
+        self.pixel_shift_step += 1
+        self.apply_scoreboard_offset(offset_x, offset_y)
+
+    def apply_scoreboard_offset(self, offset_x, offset_y):
+        # Asymmetric padding moves the board without changing its size: the two sides always add up to the
+        # maximum shift, (0, 0) included, so no quadrant is re-laid out while the shift is active.
+        max_px = max(BURN_IN_PIXEL_SHIFT_MAX_PX, 0)
+        self.quadrant_container.pack_configure(padx=(offset_x, max_px - offset_x), pady=(offset_y, max_px - offset_y))
+        self.last_updated_label.place_configure(x=offset_x, y=offset_y)
+        self.scoreboard_offset = (offset_x, offset_y)
+
+    def clear_scoreboard_offset(self):
+        self.quadrant_container.pack_configure(padx=0, pady=0)
+        self.last_updated_label.place_configure(x=0, y=0)
+        self.scoreboard_offset = None
 
     def deactivate_burn_in_screen_event(self, event=None):
         self.deactivate_burn_in_screen()
@@ -191,212 +441,554 @@ class ScoreboardApp:
     def deactivate_burn_in_screen(self):
         if not self.burn_in_screen_active: return
         print("INFO: Deactivating burn-in prevention screen.")
-        if self.burn_in_animation_id:
-            if hasattr(self, 'burn_in_window') and self.burn_in_window.winfo_exists():
-                self.burn_in_window.after_cancel(self.burn_in_animation_id)
-            self.burn_in_animation_id = None
+        self.scheduler.cancel(self.burn_in_animation_task); self.burn_in_animation_task = None
+        self.scheduler.cancel(self.burn_in_end_task); self.burn_in_end_task = None
             
-        if hasattr(self, 'burn_in_window') and self.burn_in_window.winfo_exists():
+        if self.burn_in_window is not None:
             self.burn_in_window.destroy()
             self.burn_in_window = None
-        self.burn_in_logo_label = None # Clear reference
+        self.burn_in_canvas = None # Clear reference
+        if BURN_IN_MODE == "pixel_shift": self.clear_scoreboard_offset()
         self.burn_in_screen_active = False
 
     def on_closing(self):
         print("Closing application...") 
-        if hasattr(self, 'check_burn_in_schedule_id') and self.check_burn_in_schedule_id:
-            self.root.after_cancel(self.check_burn_in_schedule_id)
-            self.check_burn_in_schedule_id = None
         if self.burn_in_screen_active: self.deactivate_burn_in_screen()
+        if PRINT_SCHEDULER_STATS:
+            for task_name, task_stats in self.scheduler.stats().items(): print(f"Timer {task_name}: {task_stats}")
+        self.scheduler.shutdown()
+        if self.metrics_server: self.metrics_server.stop()
+        if self.score_store: self.score_store.close()
+        if self.score_history: self.score_history.close()
         self.udp_stop_event.set()
         if self.udp_thread.is_alive():
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.sendto(b"shutdown", ("127.0.0.1", UDP_PORT))
-                sock.close()
-            except Exception as e: print(f"Error sending shutdown packet: {e}") 
+            try: self.udp_shutdown_write_sock.send(b"\0")
+            except OSError as e: print(f"Error waking UDP listener for shutdown: {e}") 
             self.udp_thread.join(timeout=1)
+        if self.packet_capture: self.packet_capture.close() # After the listener, so its last datagrams are written
+        self.udp_shutdown_read_sock.close(); self.udp_shutdown_write_sock.close()
+        self.close_udp_wakeup()
         self.root.quit()
         self.root.destroy()
 
     def setup_ui(self):
         # ... (setup_ui remains the same)
         self.root.configure(bg="black") 
+        self.build_quadrant_grid(len(self.channel.team_names))
+        self.last_updated_var = tk.StringVar(value=self.last_updated_text())
+        self.last_updated_label = tk.Label(self.root, textvariable=self.last_updated_var, bg="black", fg="white", font=("Arial", 12))
+        self.last_updated_label.place(relx=0.5, rely=0.02, anchor="n")
+        self.update_display()
+
+    def build_quadrant_grid(self, team_count):
+        # One tile per team, filled row by row in rank order; the grid shape is worked out once for this screen and team count.
+        # Rebuilt only when a channel with a different number of teams comes on screen.
+        if self.quadrant_container is not None: self.quadrant_container.destroy()
         self.quadrant_container = tk.Frame(self.root, bg="black") 
         self.quadrant_container.pack(fill=tk.BOTH, expand=True)
-        self.quadrant_container.grid_rowconfigure(0, weight=1, uniform="row_group")
-        self.quadrant_container.grid_rowconfigure(1, weight=1, uniform="row_group")
-        self.quadrant_container.grid_columnconfigure(0, weight=1, uniform="col_group")
-        self.quadrant_container.grid_columnconfigure(1, weight=1, uniform="col_group")
-        self.quadrant_frames_positions = { "1st": (0, 0), "2nd": (0, 1), "3rd": (1, 0), "4th": (1, 1) }
+        if self.time_to_first_frame_s is None: self.quadrant_container.bind("<Expose>", self.on_first_frame)
+        if self.scoreboard_offset is not None: self.apply_scoreboard_offset(*self.scoreboard_offset) # Keep the current shift
+        self.grid_columns, self.grid_rows = compute_grid_layout(team_count, self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.tile_font_scale = min(1.0, 2 / max(self.grid_columns, self.grid_rows)) # Fonts were sized for a 2x2 grid
+        for r in range(self.grid_rows): self.quadrant_container.grid_rowconfigure(r, weight=1, uniform="row_group")
+        for c in range(self.grid_columns): self.quadrant_container.grid_columnconfigure(c, weight=1, uniform="col_group")
+        self.quadrant_frames_positions = [divmod(position, self.grid_columns) for position in range(team_count)]
         self.quadrant_display_frames = {} 
-        for rank_str, (r, c) in self.quadrant_frames_positions.items():
+        self.quadrant_widgets = {}
+        self.quadrant_render_state = {}
+        for position, (r, c) in enumerate(self.quadrant_frames_positions):
             content_frame = tk.Frame(self.quadrant_container, bg="gray15") 
             content_frame.grid(row=r, column=c, sticky="nsew", 
                                padx=QUADRANT_SEPARATOR_THICKNESS, 
                                pady=QUADRANT_SEPARATOR_THICKNESS)
-            self.quadrant_display_frames[rank_str] = content_frame
-        self.last_updated_var = tk.StringVar(value=f"Last updated: {self.last_update_time}")
-        self.last_updated_label = tk.Label(self.root, textvariable=self.last_updated_var, bg="black", fg="white", font=("Arial", 12))
-        self.last_updated_label.place(relx=0.5, rely=0.02, anchor="n")
-        self.update_display()
+            self.quadrant_display_frames[position] = content_frame
+            self.build_single_quadrant(content_frame, position)
+
+    def last_updated_text(self):
+        if len(self.channels) == 1: return f"Last updated: {self.channel.last_update_time}"
+        return f"{self.channel.title} - Last updated: {self.channel.last_update_time}"
+
+    def show_next_channel(self):
+        # Rotation timer. Waits while a team is open fullscreen or the logo screensaver covers the board.
+        if self.fs_window_visible or (self.burn_in_screen_active and BURN_IN_MODE != "pixel_shift"): return
+        channel_ids = list(self.channels)
+        self.show_channel(self.channels[channel_ids[(channel_ids.index(self.channel.channel_id) + 1) % len(channel_ids)]])
+
+    def show_channel(self, channel):
+        # Points the renderer at another channel and redraws every tile from that channel's state.
+        if channel is self.channel: return
+        self.channel = channel
+        self.team_points = channel.team_points
+        self.ranking = channel.ranking
+        self.sorted_teams_cache = []; self.rank_gaps = {}; self.team_rank_strings = {}
+        if len(channel.team_names) != len(self.quadrant_widgets): self.build_quadrant_grid(len(channel.team_names))
+        self.last_updated_var.set(self.last_updated_text())
+        self.update_display(redraw_all=True)
     
+    def open_udp_sockets(self):
+        # One non-blocking socket per listen address, plus membership of UDP_MULTICAST_GROUP if configured.
+        # The group is joined on a wildcard socket bound to UDP_MULTICAST_PORT when there is one, so
+        # multicast and unicast traffic to that port share a socket and are not delivered twice.
+        sockets = []
+        multicast_joined = False
+        for bind_ip, bind_port in UDP_LISTEN_ADDRESSES:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            joins_group = UDP_MULTICAST_GROUP and not multicast_joined and bind_port == UDP_MULTICAST_PORT and bind_ip in ("", "0.0.0.0")
+            try:
+                # Only a multicast member shares its port; a plain unicast port already in use is reported below.
+                if joins_group: sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((bind_ip, bind_port))
+                sock.setblocking(False)
+                if joins_group:
+                    self.join_multicast_group(sock)
+                    multicast_joined = True
+            except OSError as e:
+                sock.close()
+                print(f"UDP BIND ERROR on {bind_ip}:{bind_port}: {e}") 
+                self.udp_queue.put(("error", f"ERROR: Port {bind_port} in use", None, None))
+                continue
+            print(f"Listening for UDP packets on {bind_ip}:{bind_port}") 
+            sockets.append(sock)
+        if UDP_MULTICAST_GROUP and not multicast_joined:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(("", UDP_MULTICAST_PORT))
+                sock.setblocking(False)
+                self.join_multicast_group(sock)
+                sockets.append(sock)
+            except OSError as e:
+                sock.close()
+                print(f"UDP MULTICAST ERROR for {UDP_MULTICAST_GROUP}:{UDP_MULTICAST_PORT}: {e}") 
+                self.udp_queue.put(("error", f"ERROR: Cannot join {UDP_MULTICAST_GROUP}", None, None))
+        return sockets
+
+    def join_multicast_group(self, sock):
+        membership = socket.inet_aton(UDP_MULTICAST_GROUP) + socket.inet_aton(UDP_MULTICAST_INTERFACE)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        print(f"Joined multicast group {UDP_MULTICAST_GROUP} on port {UDP_MULTICAST_PORT}") 
+
     def udp_listener(self):
-        # ... (udp_listener remains the same)
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Waits on every listen socket plus the shutdown pipe, so closing never waits for a timeout.
+        # All datagrams that are ready are read in one batch and Tk is woken once per batch.
+        sockets = self.open_udp_sockets()
+        if not self.udp_queue.empty(): self.notify_udp_wakeup() # Surface bind errors
+        state_requests_left = STATE_REQUEST_ATTEMPTS if STATE_SERVICE_ADDRESS and sockets and self.house_channel else 0
+        next_state_request = time.monotonic()
+        selector = selectors.DefaultSelector()
+        recv_buffer = bytearray(UDP_RECV_BUFFER_SIZE)
+        recv_view = memoryview(recv_buffer)
         try:
-            sock.bind((UDP_IP, UDP_PORT))
-            print(f"Listening for UDP packets on {UDP_IP}:{UDP_PORT}") 
-            sock.settimeout(1.0)
+            selector.register(self.udp_shutdown_read_sock, selectors.EVENT_READ)
+            for sock in sockets: selector.register(sock, selectors.EVENT_READ)
             while not self.udp_stop_event.is_set():
-                try:
-                    data, addr = sock.recvfrom(1024)
-                    decoded_data = data.decode('utf-8').strip()
-                    self.udp_queue.put(decoded_data)
-                except socket.timeout: continue
-                except Exception as e:
-                    if not self.udp_stop_event.is_set(): print(f"UDP Rx Error: {e}") 
-        except OSError as e:
-            print(f"UDP BIND ERROR: {e}") 
-            self.udp_queue.put(f"ERROR: Port {UDP_PORT} in use")
+                if state_requests_left and not self.state_snapshot_received and time.monotonic() >= next_state_request:
+                    self.request_state(sockets[0], "startup")
+                    state_requests_left -= 1; next_state_request = time.monotonic() + STATE_REQUEST_RETRY_S
+                awaiting_snapshot = state_requests_left and not self.state_snapshot_received
+                queued = 0
+                for key, _ in selector.select(max(next_state_request - time.monotonic(), 0) if awaiting_snapshot else None):
+                    if key.fileobj is self.udp_shutdown_read_sock: return
+                    sock = key.fileobj
+                    for _ in range(UDP_MAX_BATCH):
+                        try:
+                            nbytes, addr = sock.recvfrom_into(recv_buffer)
+                        except (BlockingIOError, InterruptedError): break
+                        except OSError as e:
+                            if not self.udp_stop_event.is_set(): print(f"UDP Rx Error: {e}") 
+                            break
+                        data = bytes(recv_view[:nbytes])
+                        if self.packet_capture: self.packet_capture.record(data, addr) # Queued only; written off this thread
+                        if self.handle_datagram(data, addr, sock): queued += 1
+                if queued: self.notify_udp_wakeup()
         finally: 
             print("UDP listener stopping.") 
-            sock.close()
+            selector.close()
+            for sock in sockets: sock.close()
     
-    def process_udp_queue(self):
-        # ... (process_udp_queue remains the same)
+    def setup_udp_wakeup(self):
+        # The listener thread writes one byte to this socket pair after queueing a message, and Tk's file
+        # handler wakes the main loop immediately instead of polling the queue every UPDATE_INTERVAL_MS.
+        # A socket pair (not os.pipe/os.set_blocking) so that on Windows setup gets as far as the polling fallback.
+        self.udp_wakeup_read_sock, self.udp_wakeup_write_sock = socket.socketpair()
+        self.udp_wakeup_read_sock.setblocking(False)
+        self.udp_wakeup_write_sock.setblocking(False)
+        try:
+            self.root.tk.createfilehandler(self.udp_wakeup_read_sock.fileno(), tk.READABLE, self.on_udp_wakeup)
+            self.udp_wakeup_enabled = True
+        except (AttributeError, tk.TclError) as e: # createfilehandler is not available on Windows
+            print(f"WARNING: Event-driven UDP wakeup unavailable ({e}), polling every {UPDATE_INTERVAL_MS} ms")
+            self.udp_wakeup_enabled = False
+
+    def notify_udp_wakeup(self):
+        # Called from the listener thread.
+        try:
+            self.udp_wakeup_write_sock.send(b"\0")
+        except OSError:
+            pass # Buffer already full (a wakeup is pending) or closed during shutdown
+
+    def on_udp_wakeup(self, fd, mask):
+        try:
+            while self.udp_wakeup_read_sock.recv(4096): pass
+        except OSError:
+            pass
+        self.process_wakeup()
+
+    def process_wakeup(self):
+        self.run_pending_tk_calls()
+        self.process_udp_queue()
+
+    def call_in_tk_thread(self, function):
+        # Used by background threads (e.g. the metrics endpoint) to run something on the Tk thread and wait for it.
+        done = threading.Event(); outcome = {}
+        self.tk_calls.put((function, done, outcome))
+        self.notify_udp_wakeup()
+        if not done.wait(MAIN_THREAD_CALL_TIMEOUT_S): raise TimeoutError("Tk thread did not respond")
+        if "error" in outcome: raise outcome["error"]
+        return outcome["result"]
+
+    def run_pending_tk_calls(self):
+        while True:
+            try:
+                function, done, outcome = self.tk_calls.get_nowait()
+            except queue.Empty:
+                return
+            try: outcome["result"] = function()
+            except Exception as e: outcome["error"] = e
+            done.set()
+
+    def close_udp_wakeup(self):
+        if self.udp_wakeup_enabled:
+            try: self.root.tk.deletefilehandler(self.udp_wakeup_read_sock.fileno())
+            except tk.TclError: pass
+            self.udp_wakeup_enabled = False
+        self.udp_wakeup_read_sock.close()
+        self.udp_wakeup_write_sock.close()
+
+    def handle_datagram(self, data, addr, sock=None):
+        # Runs on the listener thread: decode once here and drop stale frames before they reach Tk.
+        self.metric_packets_received.inc()
+        try:
+            msg_type, sender_id, sequence, payload = score_protocol.decode_packet(data)
+        except score_protocol.ProtocolError as e:
+            self.metric_packets_malformed.inc()
+            print(f"Malformed packet from {addr[0]}: {e}")
+            return False
+        if msg_type in (score_protocol.MSG_ACK, score_protocol.MSG_STATE_REQUEST): return False # Meant for senders / the state service
+        channel = self.channels.get(score_protocol.packet_channel(data))
+        if channel is None: # Not acknowledged either: this display doesn't show that board
+            self.metric_packets_unknown_channel.inc()
+            print(f"Packet from {addr[0]} for unknown channel {score_protocol.packet_channel(data)}, dropped")
+            return False
+        # Checked before acknowledging (and before the frame advances any sequence state), so a sender is never told
+        # that an update this display can't apply was delivered.
+        problem = channel.payload_problem(msg_type, payload)
+        if problem is not None:
+            self.metric_packets_malformed.inc()
+            print(f"Malformed packet from {addr[0]} for channel {channel.channel_id} ({problem}): {payload}")
+            return False
+        # Duplicate and stale frames are acknowledged too: this display already holds that update or a newer one.
+        if sock is not None and score_protocol.ack_requested(data): self.send_ack(sock, addr, sender_id, sequence)
+        if msg_type == score_protocol.MSG_STATE_SNAPSHOT:
+            if channel is not self.house_channel: return False # The state service only holds the house points
+            if not channel.sequence_tracker.accept(sender_id, sequence): return False # An older answer overtaken by a newer one
+            self.state_snapshot_received = True
+            print(f"Resynchronised from state service {addr[0]} (state seq {sequence})")
+            self.udp_queue.put(("scores", payload, time.monotonic(), channel))
+            return True
+        # A gap is only worth a resync when a delta reveals it: a full state replaces whatever was missed.
+        # Senders number frames across channels, so the missed frames may have been for the house points either way.
+        if self.gap_detector.observe(sender_id, sequence) and msg_type == score_protocol.MSG_DELTA and STATE_SERVICE_ADDRESS and sock is not None:
+            self.request_state(sock, f"missed frames from sender {sender_id:08x}")
+        if msg_type == score_protocol.MSG_DELTA:
+            if not self.delta_filter.accept(sender_id, sequence):
+                self.metric_packets_duplicate.inc()
+                print(f"Duplicate delta from {addr[0]} (sender {sender_id:08x}, seq {sequence}), dropped")
+                return False
+            self.udp_queue.put(("deltas", payload, time.monotonic(), channel))
+            return True
+        if not channel.sequence_tracker.accept(sender_id, sequence):
+            self.metric_packets_stale.inc()
+            print(f"Stale packet from {addr[0]} (sender {sender_id:08x}, seq {sequence}), dropped")
+            return False
+        self.udp_queue.put(("scores", payload, time.monotonic(), channel))
+        return True
+
+    def request_state(self, sock, reason):
+        # Listener thread. The snapshot comes back to this socket and is handled like any other frame.
+        now = time.monotonic()
+        if reason != "startup" and self.last_state_request_time is not None and now - self.last_state_request_time < RESYNC_MIN_INTERVAL_S: return
+        self.last_state_request_time = now
+        self.state_request_sequence = (self.state_request_sequence + 1) & score_protocol.SEQUENCE_MASK
+        try:
+            sock.sendto(score_protocol.encode_state_request(self.state_requester_id, self.state_request_sequence), STATE_SERVICE_ADDRESS)
+            self.metric_state_requests.inc()
+            print(f"Requested score state from {STATE_SERVICE_ADDRESS[0]}:{STATE_SERVICE_ADDRESS[1]} ({reason})")
+        except OSError as e:
+            print(f"WARNING: Could not request score state from {STATE_SERVICE_ADDRESS[0]}: {e}")
+
+    def send_ack(self, sock, addr, sender_id, sequence):
         try:
-            while not self.udp_queue.empty():
-                message = self.udp_queue.get_nowait()
-                if message.startswith("ERROR:"): 
-                    self.last_updated_var.set(message)
-                    print(f"Error from queue: {message}") 
+            sock.sendto(score_protocol.encode_ack(sender_id, sequence), addr)
+            self.metric_acks_sent.inc()
+        except OSError as e:
+            print(f"Could not send ACK to {addr[0]}: {e}")
+
+    def process_udp_queue(self):
+        # Drain everything that arrived since the last wakeup, in order. A full state replaces a channel's scores;
+        # a delta frame is applied as a whole on top of what came before it. Channels in the background only
+        # keep the result; the visible channel is rendered once.
+        pending = {} # channel -> [new points, newest receive time, frames applied]
+        while True:
+            try:
+                kind, payload, received_at, channel = self.udp_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error": 
+                self.last_updated_var.set(payload)
+                print(f"Error from queue: {payload}") 
+                continue
+            if channel not in pending: pending[channel] = [channel.team_points.copy(), None, 0]
+            update = pending[channel]
+            if kind == "deltas":
+                problem = channel.add_deltas(update[0], payload)
+                if problem is not None:
+                    self.metric_packets_malformed.inc()
+                    print(f"Malformed delta packet for channel {channel.channel_id} ({problem}): {payload}")
                     continue
-                parts = message.split(':')
-                if len(parts) == 4:
-                    try:
-                        self.team_points = { 
-                            TEAM_NAMES_ORDERED_IN_PACKET[0]: int(parts[0]), 
-                            TEAM_NAMES_ORDERED_IN_PACKET[1]: int(parts[1]), 
-                            TEAM_NAMES_ORDERED_IN_PACKET[2]: int(parts[2]), 
-                            TEAM_NAMES_ORDERED_IN_PACKET[3]: int(parts[3]) 
-                        }
-                        now = datetime.now(); hour_12 = int(now.strftime('%I')); self.last_update_time = f"{now.month}/{now.day}/{now.strftime('%y')} {hour_12}:{now.minute:02d} {now.strftime('%p')}"
-                        self.last_updated_var.set(f"Last updated: {self.last_update_time}")
-                        self.update_display()
-                    except ValueError: 
-                        print(f"Malformed packet (ValueError): {message}") 
-                else: 
-                    print(f"Malformed packet (parts != 4): {message}") 
-        finally: 
-            self.root.after(UPDATE_INTERVAL_MS, self.process_udp_queue)
-
-    def update_display(self):
-        # ... (update_display remains the same)
-        self.sorted_teams_cache = sorted(self.team_points.items(), key=lambda item: item[1], reverse=True)
-        rank_strings = ["1st", "2nd", "3rd", "4th"]
-        for i, (team_name, points) in enumerate(self.sorted_teams_cache):
-            rank_str = rank_strings[i]
-            quadrant_target_frame = self.quadrant_display_frames[rank_str] 
-            for widget in quadrant_target_frame.winfo_children(): 
-                widget.destroy()
-            self.design_single_quadrant(quadrant_target_frame, team_name, points, rank_str)
+            else:
+                new_points = channel.full_state(payload)
+                if new_points is None: 
+                    self.metric_packets_malformed.inc()
+                    print(f"Malformed packet for channel {channel.channel_id} ({len(payload)} scores, expected {len(channel.team_names)}): {payload}") 
+                    continue
+                update[0] = new_points
+            update[1] = received_at; update[2] += 1
+        if not pending: return
+        update_time = ScoreboardApp.format_update_time(datetime.now())
+        for channel, (new_points, newest_received_at, applied) in pending.items():
+            if not applied: continue
+            self.metric_packets_accepted.inc(applied)
+            self.metric_packets_coalesced.inc(applied - 1)
+            channel.team_points = new_points
+            channel.last_update_time = update_time
+            if channel is self.channel:
+                self.team_points = new_points
+                self.last_updated_var.set(self.last_updated_text())
+                self.update_display()
+                self.metric_packet_to_render.observe(time.monotonic() - newest_received_at)
+            if channel is self.house_channel:
+                if self.score_store: self.score_store.append(new_points)
+                if self.score_history: self.score_history.append([new_points[name] for name in channel.team_names])
+
+    def update_display(self, redraw_all=False):
+        render_start = time.perf_counter()
+        # The ranking is updated in place and reports which tile positions changed; only those are refreshed.
+        # redraw_all: the tiles show another channel, so every position is refreshed.
+        changed_positions = self.ranking.update(self.team_points)
+        if redraw_all and len(self.ranking): changed_positions = (0, len(self.ranking) - 1)
+        if changed_positions is not None:
+            first, last = changed_positions
+            self.sorted_teams_cache = self.ranking.items()
+            self.update_rank_gaps(max(first - 1, 0), min(last + 1, len(self.sorted_teams_cache) - 1))
+            for position in range(first, last + 1):
+                team_name, points = self.sorted_teams_cache[position]
+                rank_str = ordinal(self.ranking.rank_at(position))
+                self.team_rank_strings[team_name] = rank_str
+                self.refresh_single_quadrant(position, team_name, points, rank_str)
+        if self.fs_window_visible: self.populate_fullscreen_view(self.fs_team_name)
         if self.last_updated_label: self.last_updated_label.lift() 
-
-    def design_single_quadrant(self, parent_frame, team_name, team_points, rank_position_str):
-        # ... (design_single_quadrant remains the same)
-        current_team_color = self.team_colors.get(team_name.lower(), "gray50")
-        parent_frame.configure(bg=current_team_color) 
-        font_team_name = ("Gill Sans MT", 60, "bold")
-        font_points = ("Arial", 18)
-        font_rank_number = ("Arial", 28, "bold")
-        font_rank_suffix = ("Arial", 16, "bold")
-        top_offset_for_name = 75 
-        
-        if rank_position_str == "1st" and self.trophy_icon_image: 
-            trophy_label = tk.Label(parent_frame, image=self.trophy_icon_image, bg=current_team_color)
+        self.record_render_time(time.perf_counter() - render_start)
+
+    def update_rank_gaps(self, first, last):
+        # (points ahead of the team below, points behind the team above) per team, for the fullscreen view.
+        # Only positions first..last can have new neighbours, so the other entries are kept.
+        last_index = len(self.sorted_teams_cache) - 1
+        for i in range(first, last + 1):
+            team_name, points = self.sorted_teams_cache[i]
+            points_ahead_of_next = points - self.sorted_teams_cache[i + 1][1] if i < last_index else None
+            points_behind_prev = self.sorted_teams_cache[i - 1][1] - points if i > 0 else None
+            self.rank_gaps[team_name] = (points_ahead_of_next, points_behind_prev)
+
+    def record_render_time(self, elapsed_s):
+        self.render_count += 1
+        self.render_time_total_s += elapsed_s
+        self.render_time_max_s = max(self.render_time_max_s, elapsed_s)
+        self.metric_render_time.observe(elapsed_s)
+        if PRINT_RENDER_TIMING:
+            print(f"Render: {elapsed_s * 1000:.2f} ms (avg {self.render_time_total_s * 1000 / self.render_count:.2f} ms, "
+                  f"max {self.render_time_max_s * 1000:.2f} ms over {self.render_count} updates)")
+
+    def build_single_quadrant(self, parent_frame, position):
+        # Widgets are created once per tile position and only reconfigured afterwards (see refresh_single_quadrant).
+        scale = self.tile_font_scale
+        font_team_name = ("Gill Sans MT", max(int(60 * scale), 12), "bold")
+        font_points = ("Arial", max(int(18 * scale), 10))
+        font_rank_number = ("Arial", max(int(28 * scale), 10), "bold")
+        font_rank_suffix = ("Arial", max(int(16 * scale), 8), "bold")
+        top_offset_for_name = int(75 * scale)
+        widgets = {"frame": parent_frame}
+
+        if position == 0 and self.trophy_icon_image: 
+            trophy_label = tk.Label(parent_frame, image=self.trophy_icon_image)
             trophy_label.image = self.trophy_icon_image 
             trophy_label.place(x=15, y=15) 
-            trophy_label.bind("<Button-1>", lambda e, tn=team_name, tp=team_points, rps=rank_position_str: self.show_fullscreen_quadrant(tn, tp, rps))
-
-        display_team_name = team_name.capitalize()
-        lbl_name = tk.Label(parent_frame, text=display_team_name, font=font_team_name, bg=current_team_color, fg="white")
-        lbl_name.pack(pady=(top_offset_for_name, 10), padx=10)
-        lbl_points = tk.Label(parent_frame, text=str(team_points), font=font_points, bg=current_team_color, fg="yellow")
-        lbl_points.pack(pady=(0, 10), padx=10)
-        rank_num_text, rank_suffix_text = ScoreboardApp.get_rank_parts_static(rank_position_str)
-        rank_holder_frame = tk.Frame(parent_frame, bg=current_team_color)
-        rank_holder_frame.pack(pady=(0, 10), padx=10)
-        lbl_rank_num = tk.Label(rank_holder_frame, text=rank_num_text, font=font_rank_number, bg=current_team_color, fg="white")
-        lbl_rank_num.pack(side=tk.LEFT, fill=tk.NONE, expand=False)
-        lbl_rank_suffix = tk.Label(rank_holder_frame, text=rank_suffix_text, font=font_rank_suffix, bg=current_team_color, fg="white")
-        lbl_rank_suffix.pack(side=tk.LEFT, anchor='n', padx=(1,0), fill=tk.NONE, expand=False)
-        elements_to_bind = [parent_frame, lbl_name, lbl_points, rank_holder_frame, lbl_rank_num, lbl_rank_suffix]
-        for widget in elements_to_bind: 
-            widget.bind("<Button-1>", lambda e, tn=team_name, tp=team_points, rps=rank_position_str: self.show_fullscreen_quadrant(tn, tp, rps))
+            widgets["trophy"] = trophy_label
+
+        widgets["name"] = tk.Label(parent_frame, font=font_team_name, fg="white")
+        widgets["name"].pack(pady=(top_offset_for_name, 10), padx=10)
+        widgets["points"] = tk.Label(parent_frame, font=font_points, fg="yellow")
+        widgets["points"].pack(pady=(0, 10), padx=10)
+        widgets["rank_holder"] = tk.Frame(parent_frame)
+        widgets["rank_holder"].pack(pady=(0, 10), padx=10)
+        widgets["rank_num"] = tk.Label(widgets["rank_holder"], font=font_rank_number, fg="white")
+        widgets["rank_num"].pack(side=tk.LEFT, fill=tk.NONE, expand=False)
+        widgets["rank_suffix"] = tk.Label(widgets["rank_holder"], font=font_rank_suffix, fg="white")
+        widgets["rank_suffix"].pack(side=tk.LEFT, anchor='n', padx=(1,0), fill=tk.NONE, expand=False)
+        for widget in widgets.values(): 
+            widget.bind("<Button-1>", lambda e, p=position: self.on_quadrant_clicked(p))
+        self.quadrant_widgets[position] = widgets
+        self.quadrant_render_state[position] = (None, None, None)
+
+    def refresh_single_quadrant(self, position, team_name, team_points, rank_str):
+        # Only touch the widgets whose content actually changed since the last render.
+        shown_team, shown_points, shown_rank = self.quadrant_render_state[position]
+        widgets = self.quadrant_widgets[position]
+        if team_name != shown_team:
+            current_team_color = self.team_colors.get(team_name.lower(), "gray50")
+            for widget in widgets.values():
+                widget.configure(bg=current_team_color)
+            widgets["name"].configure(text=team_name.capitalize())
+        if team_points != shown_points or team_name != shown_team:
+            widgets["points"].configure(text=str(team_points))
+        if rank_str != shown_rank: # Tied teams share a rank, so the rank isn't fixed per position
+            rank_num_text, rank_suffix_text = ScoreboardApp.get_rank_parts_static(rank_str)
+            widgets["rank_num"].configure(text=rank_num_text); widgets["rank_suffix"].configure(text=rank_suffix_text)
+        self.quadrant_render_state[position] = (team_name, team_points, rank_str)
+
+    def on_quadrant_clicked(self, position):
+        team_name, team_points, rank_str = self.quadrant_render_state[position]
+        if team_name is not None:
+            self.show_fullscreen_quadrant(team_name, team_points, rank_str)
 
     def apply_grab(self):
-        # ... (apply_grab remains the same)
-        if hasattr(self, 'fs_window') and self.fs_window.winfo_exists():
+        self.fs_grab_task = None
+        if self.fs_window_visible:
             try:
                 self.fs_window.grab_set()
             except tk.TclError as e:
                 print(f"WARNING: FS - Error applying grab: {e}") 
 
-    def show_fullscreen_quadrant(self, team_name, team_points, rank_position_str):
-        # ... (show_fullscreen_quadrant remains largely the same, using team emblem, delayed grab) ...
-        if hasattr(self, 'fs_window') and self.fs_window.winfo_exists(): self.fs_window.destroy()
-        self.fs_window = tk.Toplevel(self.root); self.fs_window.attributes('-fullscreen', True) 
+    def build_fullscreen_view(self):
+        # The fullscreen team view is built once (after the first frame), kept withdrawn, and repopulated in place on each tap.
+        if self.fs_window is not None: return
+        self.fs_window = tk.Toplevel(self.root); self.fs_window.withdraw()
+        self.fs_window.attributes('-fullscreen', True) 
         self.fs_window.transient(self.root); self.fs_window.config(cursor="none")
-        current_team_color = self.team_colors.get(team_name.lower(), "gray20"); self.fs_window.configure(bg=current_team_color)
         self.fs_window.bind("<FocusIn>", self.reassert_fullscreen_fs); self.fs_window.bind("<Activate>", self.reassert_fullscreen_fs)
-        content_frame = tk.Frame(self.fs_window, bg=current_team_color); content_frame.pack(fill=tk.BOTH, expand=True)
-        info_block_frame = tk.Frame(content_frame, bg=current_team_color)
-        current_team_name_fs = team_name; current_team_points_fs = team_points; current_team_rank_str_fs = rank_position_str
-        # ... [score difference calculations] ...
-        current_team_rank_index = -1
-        for i, (name_iter, pts_iter) in enumerate(self.sorted_teams_cache):
-            if name_iter == current_team_name_fs: current_team_rank_index = i; break
-        points_ahead_of_next, points_behind_prev = None, None
-        if 0 <= current_team_rank_index < len(self.sorted_teams_cache):
-            if current_team_rank_index < len(self.sorted_teams_cache) - 1:
-                points_ahead_of_next = current_team_points_fs - self.sorted_teams_cache[current_team_rank_index + 1][1]
-            if current_team_rank_index > 0:
-                points_behind_prev = self.sorted_teams_cache[current_team_rank_index - 1][1] - current_team_points_fs
-        points_1st_vs_2nd, points_2nd_vs_1st, points_2nd_vs_3rd, points_3rd_vs_2nd, points_3rd_vs_4th, points_4th_vs_3rd = [None]*6
-        if len(self.sorted_teams_cache) >= 2:
-            points_1st_vs_2nd = self.sorted_teams_cache[0][1] - self.sorted_teams_cache[1][1]; points_2nd_vs_1st = self.sorted_teams_cache[1][1] - self.sorted_teams_cache[0][1]
-        if len(self.sorted_teams_cache) >= 3:
-            points_2nd_vs_3rd = self.sorted_teams_cache[1][1] - self.sorted_teams_cache[2][1]; points_3rd_vs_2nd = self.sorted_teams_cache[2][1] - self.sorted_teams_cache[1][1]
-        if len(self.sorted_teams_cache) >= 4:
-            points_3rd_vs_4th = self.sorted_teams_cache[2][1] - self.sorted_teams_cache[3][1]; points_4th_vs_3rd = self.sorted_teams_cache[3][1] - self.sorted_teams_cache[2][1]
-        fs_font_team_name = ("Gill Sans MT", 70, "bold"); fs_lbl_name = tk.Label(info_block_frame, text=current_team_name_fs.capitalize(), font=fs_font_team_name, bg=current_team_color, fg="white"); fs_lbl_name.pack(pady=(0, 15))
-        fs_font_points = ("Arial", 40); fs_lbl_points = tk.Label(info_block_frame, text=str(current_team_points_fs), font=fs_font_points, bg=current_team_color, fg="yellow"); fs_lbl_points.pack(pady=(0, 15))
-        fs_font_rank_number = ("Arial", 50, "bold"); fs_font_rank_suffix = ("Arial", 25, "bold"); fs_rank_num_text, fs_rank_suffix_text = ScoreboardApp.get_rank_parts_static(current_team_rank_str_fs)
-        fs_rank_holder_frame = tk.Frame(info_block_frame, bg=current_team_color); fs_rank_holder_frame.pack(pady=(0, 15))
-        fs_lbl_rank_num = tk.Label(fs_rank_holder_frame, text=fs_rank_num_text, font=fs_font_rank_number, bg=current_team_color, fg="white"); fs_lbl_rank_num.pack(side=tk.LEFT, fill=tk.NONE, expand=False)
-        fs_lbl_rank_suffix = tk.Label(fs_rank_holder_frame, text=fs_rank_suffix_text, font=fs_font_rank_suffix, bg=current_team_color, fg="white"); fs_lbl_rank_suffix.pack(side=tk.LEFT, anchor='n', padx=(1,0), fill=tk.NONE, expand=False)
+        self.fs_window.bind('<Escape>', lambda e: self.close_fullscreen_quadrant())
+        self.fs_window.protocol("WM_DELETE_WINDOW", self.close_fullscreen_quadrant)
+        w = self.fs_widgets = {}
+        w["content"] = tk.Frame(self.fs_window); w["content"].pack(fill=tk.BOTH, expand=True)
+        w["top_spacer"] = tk.Frame(w["content"]); w["top_spacer"].pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        w["info_block"] = tk.Frame(w["content"]); w["info_block"].pack(side=tk.TOP) 
+        w["bottom_spacer"] = tk.Frame(w["content"]); w["bottom_spacer"].pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        fs_font_team_name = ("Gill Sans MT", 70, "bold"); w["name"] = tk.Label(w["info_block"], font=fs_font_team_name, fg="white"); w["name"].pack(pady=(0, 15))
+        fs_font_points = ("Arial", 40); w["points"] = tk.Label(w["info_block"], font=fs_font_points, fg="yellow"); w["points"].pack(pady=(0, 15))
+        fs_font_rank_number = ("Arial", 50, "bold"); fs_font_rank_suffix = ("Arial", 25, "bold")
+        w["rank_holder"] = tk.Frame(w["info_block"]); w["rank_holder"].pack(pady=(0, 15))
+        w["rank_num"] = tk.Label(w["rank_holder"], font=fs_font_rank_number, fg="white"); w["rank_num"].pack(side=tk.LEFT, fill=tk.NONE, expand=False)
+        w["rank_suffix"] = tk.Label(w["rank_holder"], font=fs_font_rank_suffix, fg="white"); w["rank_suffix"].pack(side=tk.LEFT, anchor='n', padx=(1,0), fill=tk.NONE, expand=False)
         diff_label_fg = "white"; diff_font = ("Arial", 16)
-        if points_ahead_of_next is not None: tk.Label(info_block_frame, text=f"{points_ahead_of_next} pts ahead of previous", font=diff_font, bg=current_team_color, fg=diff_label_fg).pack(pady=3)
-        if points_behind_prev is not None: tk.Label(info_block_frame, text=f"{points_behind_prev} pts behind next", font=diff_font, bg=current_team_color, fg=diff_label_fg).pack(pady=3)
-        team_emblem_photo_local = None; emblem_label_widget = None
-        try:
-            image_filename = os.path.join(IMAGE_BASE_PATH, f"{team_name.lower()}.png")
-            if not os.path.exists(image_filename): print(f"!!! WARNING: FS - TEAM emblem file not found: {image_filename}")
+        w["diffs"] = tk.Frame(w["info_block"]); w["diffs"].pack()
+        w["ahead"] = tk.Label(w["diffs"], font=diff_font, fg=diff_label_fg)
+        w["behind"] = tk.Label(w["diffs"], font=diff_font, fg=diff_label_fg)
+        w["trend"] = tk.Canvas(w["info_block"], width=TREND_WIDTH_PX, height=TREND_HEIGHT_PX, highlightthickness=0)
+        self.fs_trend_line = w["trend"].create_line(0, 0, 0, 0, fill="yellow", width=1, state="hidden")
+        self.fs_trend_caption = w["trend"].create_text(TREND_WIDTH_PX // 2, TREND_HEIGHT_PX - 2, anchor="s", fill="white", font=("Arial", 10), text=f"Last {TREND_DAYS} days")
+        if self.score_history: w["trend"].pack(pady=(10, 0))
+        w["emblem"] = tk.Label(w["info_block"])
+        w["close"] = tk.Button(w["info_block"], text="Close", font=("Arial", 16), command=self.close_fullscreen_quadrant, bg="gray10", fg="white", activebackground="gray30"); w["close"].pack(pady=(20,0)) 
+        self.fs_team_name = None
+        self.fs_team_color = None
+
+    def populate_fullscreen_view(self, team_name):
+        w = self.fs_widgets
+        current_team_color = self.team_colors.get(team_name.lower(), "gray20")
+        if current_team_color != self.fs_team_color:
+            self.fs_window.configure(bg=current_team_color)
+            for key, widget in w.items():
+                if key != "close": widget.configure(bg=current_team_color)
+            self.fs_team_color = current_team_color
+        if team_name != self.fs_team_name:
+            w["name"].configure(text=team_name.capitalize())
+            team_emblem_photo = self.team_emblem_image(team_name)
+            if team_emblem_photo is None:
+                print(f"!!! WARNING: FS - TEAM emblem not available for {team_name}")
+                w["emblem"].pack_forget()
             else:
-                team_emblem_photo_local = tk.PhotoImage(file=image_filename)
-                emblem_label_widget = tk.Label(info_block_frame, image=team_emblem_photo_local, bg=current_team_color)
-                emblem_label_widget.image = team_emblem_photo_local 
-                emblem_label_widget.pack(pady=(20, 0)) 
-        except Exception as e: print(f"!!! WARNING: FS - ERROR loading TEAM emblem '{image_filename}': {type(e).__name__} - {e} !!!")
-        close_button = tk.Button(info_block_frame, text="Close", font=("Arial", 16), command=self.close_fullscreen_quadrant, bg="gray10", fg="white", activebackground="gray30"); close_button.pack(pady=(20,0)) 
-        top_spacer = tk.Frame(content_frame, bg=current_team_color); top_spacer.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        info_block_frame.pack(side=tk.TOP) 
-        bottom_spacer = tk.Frame(content_frame, bg=current_team_color); bottom_spacer.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        self.fs_window.bind('<Escape>', lambda e: self.close_fullscreen_quadrant())
-        self.fs_window_close_timer = self.root.after(TEMP_FULLSCREEN_DURATION_MS, self.close_fullscreen_quadrant)
-        self.fs_window.update_idletasks(); self.fs_window.update()           
-        self.fs_window.after(100, self.apply_grab) 
+                w["emblem"].configure(image=team_emblem_photo); w["emblem"].image = team_emblem_photo 
+                w["emblem"].pack(before=w["close"], pady=(20, 0)) 
+            self.fs_team_name = team_name
+        w["points"].configure(text=str(self.team_points[team_name]))
+        fs_rank_num_text, fs_rank_suffix_text = ScoreboardApp.get_rank_parts_static(self.team_rank_strings.get(team_name, ""))
+        w["rank_num"].configure(text=fs_rank_num_text); w["rank_suffix"].configure(text=fs_rank_suffix_text)
+        points_ahead_of_next, points_behind_prev = self.rank_gaps.get(team_name, (None, None))
+        w["ahead"].pack_forget(); w["behind"].pack_forget()
+        if points_ahead_of_next is not None: w["ahead"].configure(text=f"{points_ahead_of_next} pts ahead of previous"); w["ahead"].pack(pady=3)
+        if points_behind_prev is not None: w["behind"].configure(text=f"{points_behind_prev} pts behind next"); w["behind"].pack(pady=3)
+        show_trend = self.score_history is not None and self.channel is self.house_channel
+        if show_trend != bool(w["trend"].winfo_manager()):
+            if show_trend: w["trend"].pack(after=w["diffs"], pady=(10, 0))
+            else: w["trend"].pack_forget()
+        if show_trend: self.draw_trend(team_name)
+
+    def draw_trend(self, team_name):
+        # One line item zig-zagging between each pixel column's min and max, so the canvas never grows.
+        canvas = self.fs_widgets["trend"]
+        now = time.time()
+        buckets = self.score_history.downsample(self.house_channel.team_names.index(team_name), TREND_WIDTH_PX, now - TREND_DAYS * 86400, now + 1)
+        filled = [(x, bucket) for x, bucket in enumerate(buckets) if bucket is not None]
+        if not filled:
+            canvas.itemconfigure(self.fs_trend_line, state="hidden")
+            return
+        lowest = min(low for _, (low, _) in filled); highest = max(high for _, (_, high) in filled)
+        plot_height = TREND_HEIGHT_PX - 16 # Room for the caption
+        scale = (plot_height - 2) / max(highest - lowest, 1)
+        points = []
+        for x, (low, high) in filled:
+            points.extend((x, plot_height - 1 - (high - lowest) * scale, x, plot_height - 1 - (low - lowest) * scale))
+        if len(points) < 6: points.extend((points[0] + 1, points[1])) # A line needs at least two distinct points
+        canvas.coords(self.fs_trend_line, *points)
+        canvas.itemconfigure(self.fs_trend_line, state="normal")
+
+    def show_fullscreen_quadrant(self, team_name, team_points, rank_position_str):
+        # No update()/update_idletasks() here: Tk draws the view on its next idle pass, so UDP processing carries on.
+        if team_name not in self.team_points: return
+        self.build_fullscreen_view() # Normally done already in idle time after startup
+        self.populate_fullscreen_view(team_name)
+        self.scheduler.cancel(self.fs_window_close_task)
+        self.fs_window_close_task = self.scheduler.call_later(TEMP_FULLSCREEN_DURATION_MS, self.close_fullscreen_quadrant)
+        if not self.fs_window_visible:
+            self.fs_window_visible = True
+            self.fs_window.deiconify(); self.fs_window.attributes('-fullscreen', True); self.fs_window.lift(); self.fs_window.focus_set()
+            self.fs_grab_task = self.scheduler.call_later(100, self.apply_grab) 
+
+    def team_emblem_image(self, team_name):
+        emblem_path = os.path.join(IMAGE_BASE_PATH, f"{team_name.lower()}.png")
+        return self.image_cache.get_fitted(emblem_path, *self.emblem_max_size)
+
+    @staticmethod
+    def format_update_time(when):
+        hour_12 = int(when.strftime('%I'))
+        return f"{when.month}/{when.day}/{when.strftime('%y')} {hour_12}:{when.minute:02d} {when.strftime('%p')}"
+
+    @staticmethod
+    def get_pixel_shift_path(max_px):
+        # Offsets visited in turn: corners and edge midpoints of the max_px square, then its centre.
+        max_px = max(max_px, 0); half = max_px // 2
+        path = [(0, 0), (half, 0), (max_px, 0), (max_px, half), (max_px, max_px), (half, max_px), (0, max_px), (0, half), (half, half)]
+        return list(dict.fromkeys(path)) # Small maxima make some of them coincide
 
     @staticmethod
     def get_rank_parts_static(rank_str):
@@ -408,13 +1000,13 @@ class ScoreboardApp:
         return num_part, suffix_part
 
     def close_fullscreen_quadrant(self):
-        if hasattr(self, 'fs_window_close_timer') and self.fs_window_close_timer is not None:
-            self.root.after_cancel(self.fs_window_close_timer)
-            self.fs_window_close_timer = None 
-        if hasattr(self, 'fs_window') and self.fs_window.winfo_exists():
+        self.scheduler.cancel(self.fs_window_close_task); self.fs_window_close_task = None 
+        self.scheduler.cancel(self.fs_grab_task); self.fs_grab_task = None
+        if self.fs_window_visible:
             try: self.fs_window.grab_release()
             except tk.TclError as e: print(f"WARNING: FS - Info during grab_release: {e}") 
-            self.fs_window.destroy()
+            self.fs_window.withdraw()
+            self.fs_window_visible = False
         
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,44 @@
+import score_protocol
+from score_channels import ScoreChannel
+from score_service import ScoreService
+
+TEAMS = ["castile", "capet", "essex", "milan"]
+
+
+def test_add_deltas_refuses_unknown_team_index():
+    channel = ScoreChannel(0, "House points", TEAMS)
+    points = dict(channel.team_points)
+    assert channel.add_deltas(points, [(0, 5), (4, 1)]) is not None
+    assert points == channel.team_points # Nothing applied
+
+
+def test_add_deltas_refuses_a_frame_that_would_overflow():
+    channel = ScoreChannel(0, "House points", TEAMS)
+    points = dict(channel.team_points)
+    assert channel.add_deltas(points, [(1, score_protocol.SCORE_MAX)]) is None
+    assert channel.add_deltas(points, [(0, 7), (1, score_protocol.SCORE_MAX)]) is not None
+    assert points == {"castile": 0, "capet": score_protocol.SCORE_MAX, "essex": 0, "milan": 0}
+    # Increments to the same team are summed before the check, and may cancel out.
+    assert channel.add_deltas(points, [(1, 1), (1, -1)]) is None
+
+
+def test_service_refuses_overflowing_deltas_and_still_snapshots():
+    service = ScoreService(TEAMS, listen_address=("127.0.0.1", 0))
+    try:
+        for sequence in (1, 2):
+            frame = score_protocol.encode_deltas(1234, sequence, [(0, score_protocol.SCORE_MAX)])
+            service.handle_datagram(service.sockets[0], frame, ("127.0.0.1", 9))
+        assert service.points["castile"] == score_protocol.SCORE_MAX
+        _, _, _, scores = score_protocol.decode_packet(service.snapshot_packet())
+        assert scores == (score_protocol.SCORE_MAX, 0, 0, 0)
+    finally:
+        service.stop()
+
+
+def test_payload_problem_checks_team_count_and_indexes():
+    channel = ScoreChannel(0, "House points", TEAMS)
+    assert channel.payload_problem(score_protocol.MSG_FULL_STATE, (1, 2, 3, 4)) is None
+    assert channel.payload_problem(score_protocol.MSG_FULL_STATE, (1, 2, 3)) is not None
+    assert channel.payload_problem(score_protocol.MSG_STATE_SNAPSHOT, (1, 2, 3, 4, 5)) is not None
+    assert channel.payload_problem(score_protocol.MSG_DELTA, ((3, 1),)) is None
+    assert channel.payload_problem(score_protocol.MSG_DELTA, ((0, 1), (4, 1))) is not None
@@ -0,0 +1,52 @@
+import pytest
+
+import packet_capture
+from packet_capture import PacketCapture, read_capture
+
+
+def test_capture_round_trip(tmp_path):
+    path = str(tmp_path / "captures" / "run.hpcap")
+    capture = PacketCapture(path)
+    capture.start()
+    datagrams = [(b"HP\x01first", ("192.168.1.20", 40000)), (b"", ("10.0.0.1", 1)), (bytes(range(256)) * 4, ("127.0.0.1", 65535))]
+    for offset_s, (data, addr) in enumerate(datagrams):
+        capture.record(data, addr, received_at=capture.start_monotonic + offset_s * 0.25)
+    capture.close()
+    assert (capture.recorded, capture.dropped) == (3, 0)
+    start_time, records = read_capture(path)
+    assert start_time > 0
+    assert [(offset_s, addr, data) for offset_s, addr, data in records] == [
+        (offset_s * 0.25, addr, data) for offset_s, (data, addr) in enumerate(datagrams)]
+
+
+def test_torn_final_record_is_ignored(tmp_path):
+    path = str(tmp_path / "run.hpcap")
+    capture = PacketCapture(path)
+    capture.start()
+    for index in range(3): capture.record(b"datagram %d" % index, ("10.0.0.2", 12345))
+    capture.close()
+    with open(path, "r+b") as capture_file:
+        capture_file.truncate(capture_file.seek(0, 2) - 4)
+    _, records = read_capture(path)
+    assert [data for _, _, data in records] == [b"datagram 0", b"datagram 1"]
+
+
+def test_size_limit_counts_everything_not_written(tmp_path):
+    path = str(tmp_path / "run.hpcap")
+    limit = packet_capture.CAPTURE_HEADER_STRUCT.size + 2 * (packet_capture.CAPTURE_RECORD_STRUCT.size + 10)
+    capture = PacketCapture(path, max_bytes=limit)
+    capture._write_batch([(capture.start_monotonic, ("10.0.0.3", 1), b"x" * 10)] * 2) # Exactly fills the limit
+    capture._write_batch([(capture.start_monotonic, ("10.0.0.3", 1), b"y" * 10)] * 3)
+    capture.record(b"z", ("10.0.0.3", 1))
+    capture.close()
+    assert capture.full
+    assert (capture.recorded, capture.dropped) == (2, 4)
+    _, records = read_capture(path)
+    assert [data for _, _, data in records] == [b"x" * 10] * 2
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "not-a-capture.bin"
+    path.write_bytes(b"PNG....")
+    with pytest.raises(ValueError):
+        read_capture(str(path))
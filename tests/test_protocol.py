@@ -0,0 +1,55 @@
+import pytest
+
+import score_protocol
+from score_protocol import DuplicateFilter, SequenceTracker, SEQUENCE_MASK
+
+SENDER = 0x12345678
+
+
+def test_sequence_tracker_accepts_across_wraparound():
+    tracker = SequenceTracker()
+    for sequence in (SEQUENCE_MASK - 2, SEQUENCE_MASK - 1, SEQUENCE_MASK, 0, 1, 2):
+        assert tracker.accept(SENDER, sequence)
+    assert not tracker.accept(SENDER, SEQUENCE_MASK) # Older than 2 once wrapped
+    assert not tracker.accept(SENDER, 2) # Duplicate
+
+
+def test_sequence_tracker_keeps_senders_apart():
+    tracker = SequenceTracker()
+    assert tracker.accept(1, 100)
+    assert tracker.accept(2, 5)
+    assert not tracker.accept(1, 99)
+    assert tracker.accept(None, 0) # Legacy text packets
+
+
+def test_duplicate_filter_accepts_late_frames_once_across_wraparound():
+    duplicate_filter = DuplicateFilter(window=16)
+    assert duplicate_filter.accept(SENDER, SEQUENCE_MASK - 1)
+    assert duplicate_filter.accept(SENDER, 1) # Skips SEQUENCE_MASK and 0
+    assert duplicate_filter.accept(SENDER, 0) # Late, from before the wrap
+    assert duplicate_filter.accept(SENDER, SEQUENCE_MASK)
+    for sequence in (SEQUENCE_MASK - 1, SEQUENCE_MASK, 0, 1):
+        assert not duplicate_filter.accept(SENDER, sequence)
+
+
+def test_duplicate_filter_drops_frames_outside_the_window():
+    duplicate_filter = DuplicateFilter(window=16)
+    assert duplicate_filter.accept(SENDER, 5)
+    assert duplicate_filter.accept(SENDER, 5 + 20) # Jump larger than the window resets the bitmask
+    assert not duplicate_filter.accept(SENDER, 5 + 20 - 16) # Too old to check
+    assert duplicate_filter.accept(SENDER, 5 + 20 - 15)
+    assert not duplicate_filter.accept(SENDER, 5 + 20 - 15)
+
+
+def test_full_state_round_trip_masks_sequence():
+    frame = score_protocol.encode_full_state(SENDER, SEQUENCE_MASK + 3, [1, -2, 3], channel=7)
+    header = score_protocol.HEADER_STRUCT.unpack_from(frame)
+    assert header[4:] == (3, SENDER, 2)
+    assert header[3] == 7
+
+
+def test_text_packet_scores_are_limited_to_32_bits():
+    assert score_protocol.decode_packet(b"2147483647:1:-2147483648:3") == (score_protocol.MSG_FULL_STATE, None, None, (2147483647, 1, -2147483648, 3))
+    for packet in (b"3000000000:1:2:3", b"1:2:3:-2147483649"):
+        with pytest.raises(score_protocol.ProtocolError):
+            score_protocol.decode_packet(packet)
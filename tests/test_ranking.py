@@ -0,0 +1,70 @@
+import random
+
+from score_ranking import IncrementalRanking, compute_grid_layout, ordinal
+
+
+def brute_force_tiles(points_by_team, team_names):
+    # (team, competition rank, points) per position, from a full sort.
+    ordered = sorted(points_by_team, key=lambda name: (-points_by_team[name], team_names.index(name)))
+    return [(name, 1 + sum(other > points_by_team[name] for other in points_by_team.values()), points_by_team[name])
+            for name in ordered]
+
+
+def tiles(ranking):
+    return [(ranking.team_at(position), ranking.rank_at(position), ranking.points_at(position)) for position in range(len(ranking))]
+
+
+def test_changed_range_covers_every_changed_tile():
+    generator = random.Random(1234)
+    for team_count in (1, 2, 4, 7, 11):
+        team_names = [f"team{index}" for index in range(team_count)]
+        ranking = IncrementalRanking(team_names)
+        points = {}
+        for _ in range(400):
+            team_name = generator.choice(team_names)
+            new_points = generator.randint(0, 6) # Narrow range, so ties are common
+            before = brute_force_tiles(points, team_names)
+            changed = ranking.set_points(team_name, new_points)
+            points[team_name] = new_points
+            after = brute_force_tiles(points, team_names)
+            assert tiles(ranking) == after
+            differing = [position for position in range(len(after)) if position >= len(before) or before[position] != after[position]]
+            if changed is None:
+                assert not differing
+            else:
+                first, last = changed
+                assert all(first <= position <= last for position in differing), (before, after, changed)
+
+
+def test_update_returns_union_of_changes():
+    ranking = IncrementalRanking(["a", "b", "c", "d"])
+    assert ranking.update({"a": 0, "b": 0, "c": 0, "d": 0}) == (0, 3)
+    assert ranking.update({"a": 0, "b": 0, "c": 0, "d": 0}) is None
+    assert ranking.update({"d": 5}) == (0, 3)
+    assert ranking.items() == [("d", 5), ("a", 0), ("b", 0), ("c", 0)]
+
+
+def test_grid_layout_avoids_single_rows_for_prime_counts():
+    assert compute_grid_layout(4, 1920, 1080) == (2, 2)
+    assert compute_grid_layout(7, 1920, 1080) == (4, 2)
+    assert compute_grid_layout(11, 1920, 1080) == (4, 3)
+
+
+def test_grid_layout_fits_every_team_with_few_empty_cells():
+    for screen in ((1920, 1080), (1080, 1920), (800, 480)):
+        for team_count in range(1, 41):
+            columns, rows = compute_grid_layout(team_count, *screen)
+            empty_cells = columns * rows - team_count
+            assert 0 <= empty_cells <= max(1, team_count // 5), (screen, team_count, columns, rows)
+            assert empty_cells < columns # Only the last row has gaps
+
+
+def test_grid_layout_follows_the_screen_shape():
+    assert compute_grid_layout(12, 1920, 1080) == (4, 3)
+    assert compute_grid_layout(12, 1080, 1920) == (2, 6)
+    assert compute_grid_layout(1, 1920, 1080) == (1, 1)
+
+
+def test_ordinal_suffixes():
+    assert [ordinal(number) for number in (1, 2, 3, 4, 11, 12, 13, 21, 22, 101, 111)] == [
+        "1st", "2nd", "3rd", "4th", "11th", "12th", "13th", "21st", "22nd", "101st", "111th"]
@@ -0,0 +1,81 @@
+import socket
+import threading
+
+import pytest
+
+import reliable_delivery
+import score_protocol
+from reliable_delivery import DeliveryWorker
+
+SENDER_ID = 0xCAFE
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(reliable_delivery, "RETRY_INITIAL_S", 0.05)
+    monkeypatch.setattr(reliable_delivery, "RETRY_MAX_S", 0.1)
+    monkeypatch.setattr(reliable_delivery, "DELIVERY_TIMEOUT_S", 1.0)
+
+
+class FakeDisplay:
+    # Loopback display that ignores the first `drop_first` copies of each sequence, then ACKs it.
+    def __init__(self, drop_first):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.address = self.sock.getsockname()
+        self.drop_first = drop_first
+        self.copies = {}
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped:
+            try: data, addr = self.sock.recvfrom(2048)
+            except OSError: continue
+            _, sender_id, sequence, _ = score_protocol.decode_packet(data)
+            self.copies[sequence] = self.copies.get(sequence, 0) + 1
+            if self.copies[sequence] > self.drop_first:
+                self.sock.sendto(score_protocol.encode_ack(sender_id, sequence), addr)
+
+    def close(self):
+        self.stopped = True
+        self.thread.join(timeout=1)
+        self.sock.close()
+
+
+def deliver(display, sequences):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    worker = DeliveryWorker(sock, SENDER_ID)
+    try:
+        frames = [(sequence, score_protocol.encode_full_state(SENDER_ID, sequence, [1, 2, 3, 4], ack_requested=True)) for sequence in sequences]
+        worker.submit(frames, [display.address], "Update")
+        return worker.results.get(timeout=3)
+    finally:
+        worker.close()
+        sock.close()
+
+
+def test_lost_frames_are_retransmitted_until_acknowledged(fast_retries):
+    display = FakeDisplay(drop_first=1)
+    try:
+        target, delivered, detail = deliver(display, [1, 2])
+    finally:
+        display.close()
+    assert target == f"{display.address[0]}:{display.address[1]}"
+    assert delivered, detail
+    assert "2 sends" in detail
+    assert display.copies == {1: 2, 2: 2} # Acknowledged frames are not sent again
+
+
+def test_delivery_fails_without_acks(fast_retries):
+    display = FakeDisplay(drop_first=1000)
+    try:
+        _, delivered, detail = deliver(display, [7])
+    finally:
+        display.close()
+    assert not delivered
+    assert "FAILED" in detail
+    assert display.copies[7] > 2
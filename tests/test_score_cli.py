@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+import score_cli
+
+TEAMS = ["castile", "capet", "essex", "milan"]
+
+
+def decode_array(text, chunk_size=3):
+    # Small chunks, so values are split across reads.
+    original = score_cli.JSON_CHUNK_SIZE
+    score_cli.JSON_CHUNK_SIZE = chunk_size
+    try:
+        return list(score_cli.iter_json_array(io.StringIO(text)))
+    finally:
+        score_cli.JSON_CHUNK_SIZE = original
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[]", []),
+    (" [ ]\n", []),
+    ('[{"team": "capet", "points": 12}]', [{"team": "capet", "points": 12}]),
+    ('[\n  {"a": 1},\n  {"b": [2, 3]}\n]', [{"a": 1}, {"b": [2, 3]}]),
+    ('[1, 22, "x,y", null]', [1, 22, "x,y", None]),
+])
+def test_iter_json_array_decodes(text, expected):
+    assert decode_array(text) == expected
+    assert decode_array(text, chunk_size=1 << 16) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1} {"b": 2}]', # Missing comma
+    '[{"a": 1},]',
+    '[,{"a": 1}]',
+    '[{"a": 1},,{"b": 2}]',
+    '[{"a": 1}',
+    '{"a": 1}',
+    "",
+])
+def test_iter_json_array_rejects(text):
+    with pytest.raises(ValueError):
+        decode_array(text)
+
+
+def test_aggregate_skips_bad_rows_and_accepts_whole_floats():
+    records = [
+        {"team": "Castile", "points": "5"},
+        {"team": "capet", "points": 2.0},
+        {"team": "capet", "points": 2.5},
+        {"team": "rome", "points": 1},
+        7,
+        score_cli.InvalidRecord("invalid JSON"),
+        {"team": "milan", "points": " -3 "},
+    ]
+    totals, used, skipped = score_cli.aggregate(records, TEAMS)
+    assert totals == [5, 2, 0, -3]
+    assert used == 3
+    assert [row for row, _ in skipped] == [3, 4, 5, 6]
+
+
+def test_jsonl_reports_undecodable_lines_as_skipped(tmp_path):
+    path = tmp_path / "merits.jsonl"
+    path.write_text('{"team": "essex", "points": 4}\n\n{"team": "essex", points: 1}\n{"team": "milan", "points": 1.0}\n', encoding="utf-8")
+    totals, used, skipped = score_cli.aggregate(score_cli.read_records(str(path)), TEAMS)
+    assert totals == [0, 0, 4, 1]
+    assert used == 2
+    assert len(skipped) == 1 and skipped[0][0] == 2 and "invalid JSON" in skipped[0][1]
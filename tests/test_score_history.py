@@ -0,0 +1,65 @@
+from score_history import HISTORY_MIN_INTERVAL_S, ScoreHistory
+
+
+def open_history(tmp_path, team_count=2, capacity=8):
+    return ScoreHistory(str(tmp_path / "history.bin"), team_count, capacity)
+
+
+def test_downsample_min_max_per_bucket(tmp_path):
+    history = open_history(tmp_path)
+    try:
+        for minute, scores in enumerate([(1, 10), (5, 20), (3, 30), (8, 40)]):
+            history.append(scores, timestamp=1000 + minute * HISTORY_MIN_INTERVAL_S)
+        end_time = 1000 + 4 * HISTORY_MIN_INTERVAL_S
+        assert history.downsample(0, 2, 1000, end_time) == [(1, 5), (3, 8)]
+        assert history.downsample(1, 4, 1000, end_time) == [(10, 10), (20, 20), (30, 30), (40, 40)]
+        assert history.downsample(0, 8, 1000, end_time) == [(1, 1), None, (5, 5), None, (3, 3), None, (8, 8), None]
+        assert history.downsample(0, 2, 0, 500) == [None, None]
+    finally:
+        history.close()
+
+
+def test_downsample_reads_the_ring_in_order_after_wrapping(tmp_path):
+    history = open_history(tmp_path, team_count=1, capacity=4)
+    try:
+        for minute in range(6): # Slots 0 and 1 are overwritten by minutes 4 and 5
+            history.append([minute], timestamp=minute * HISTORY_MIN_INTERVAL_S)
+        assert history.count == 4
+        assert history.downsample(0, 1, 0, 6 * HISTORY_MIN_INTERVAL_S) == [(2, 5)]
+        assert history.downsample(0, 6, 0, 6 * HISTORY_MIN_INTERVAL_S) == [None, None, (2, 2), (3, 3), (4, 4), (5, 5)]
+    finally:
+        history.close()
+
+
+def test_updates_within_the_interval_replace_the_newest_sample(tmp_path):
+    history = open_history(tmp_path)
+    try:
+        history.append((1, 1), timestamp=1000)
+        history.append((2, 2), timestamp=1000 + HISTORY_MIN_INTERVAL_S - 1)
+        assert history.count == 1
+        assert history.downsample(0, 1, 1000, 2000) == [(2, 2)]
+    finally:
+        history.close()
+
+
+def test_out_of_range_scores_are_not_recorded(tmp_path):
+    history = open_history(tmp_path)
+    try:
+        assert history.append((1, 2), timestamp=1000)
+        assert not history.append((3000000000, 2), timestamp=1000 + HISTORY_MIN_INTERVAL_S)
+        assert history.count == 1
+        assert history.downsample(0, 1, 1000, 2000) == [(1, 1)]
+    finally:
+        history.close()
+
+
+def test_history_survives_reopening(tmp_path):
+    history = open_history(tmp_path)
+    history.append((4, 7), timestamp=1000)
+    history.close()
+    history = open_history(tmp_path)
+    try:
+        assert history.count == 1
+        assert history.downsample(1, 1, 1000, 1001) == [(7, 7)]
+    finally:
+        history.close()
@@ -0,0 +1,33 @@
+import socket
+
+import score_protocol
+from score_service import ScoreService
+
+TEAMS = ["castile", "capet", "essex", "milan"]
+
+
+def test_service_keeps_serving_after_a_failing_datagram():
+    service = ScoreService(TEAMS, listen_address=("127.0.0.1", 0))
+    handle_datagram = service.handle_datagram
+    failures = []
+
+    def failing_once(sock, data, addr):
+        if not failures:
+            failures.append(data)
+            raise RuntimeError("boom")
+        handle_datagram(sock, data, addr)
+
+    service.handle_datagram = failing_once
+    service.start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(2)
+    try:
+        address = service.sockets[0].getsockname()
+        client.sendto(score_protocol.encode_full_state(1, 1, [1, 2, 3, 4]), address)
+        client.sendto(score_protocol.encode_state_request(2, 1), address)
+        reply, _ = client.recvfrom(1024)
+        assert score_protocol.decode_packet(reply)[0] == score_protocol.MSG_STATE_SNAPSHOT
+        assert service.thread.is_alive()
+    finally:
+        client.close()
+        service.stop()
@@ -0,0 +1,69 @@
+import os
+
+import score_store
+from score_store import ScoreStore
+
+TEAMS = ["Castile", "Capet", "Essex", "Milan"]
+
+
+def write_states(directory, states):
+    # Writes each state as its own batch and stops without close(), as after a crash.
+    store = ScoreStore(directory, TEAMS)
+    store.load()
+    for index, scores in enumerate(states):
+        store._write_batch([(1000.0 + index, tuple(scores))])
+    store.log_file.close()
+    return os.path.join(directory, score_store.LOG_FILENAME)
+
+
+def test_torn_log_tail_is_cut_off(tmp_path):
+    log_path = write_states(str(tmp_path), [(1, 2, 3, 4), (5, 6, 7, 8)])
+    with open(log_path, "ab") as log_file:
+        log_file.write(score_store.encode_record(3, 1002.0, (9, 9, 9, 9))[:-5]) # Power loss mid-record
+    store = ScoreStore(str(tmp_path), TEAMS)
+    points, timestamp = store.load()
+    assert points == dict(zip(TEAMS, (5, 6, 7, 8)))
+    assert timestamp == 1001.0
+    assert store.next_record_number == 3
+    # The torn bytes are truncated, so the next record follows the last valid one.
+    store._write_batch([(1003.0, (10, 11, 12, 13))])
+    store.log_file.close()
+    points, _ = ScoreStore(str(tmp_path), TEAMS).load()
+    assert points == dict(zip(TEAMS, (10, 11, 12, 13)))
+
+
+def test_corrupted_record_stops_replay(tmp_path):
+    log_path = write_states(str(tmp_path), [(1, 1, 1, 1), (2, 2, 2, 2)])
+    with open(log_path, "r+b") as log_file:
+        log_file.seek(-1, os.SEEK_END)
+        last_byte = log_file.read(1)
+        log_file.seek(-1, os.SEEK_END)
+        log_file.write(bytes([last_byte[0] ^ 0xFF])) # Bad CRC on the last record
+    points, _ = ScoreStore(str(tmp_path), TEAMS).load()
+    assert points == dict(zip(TEAMS, (1, 1, 1, 1)))
+
+
+def test_snapshot_and_log_tail_are_combined(tmp_path):
+    store = ScoreStore(str(tmp_path), TEAMS)
+    store.load()
+    store.start()
+    store.append(dict(zip(TEAMS, (4, 3, 2, 1))), timestamp=2000.0)
+    store.close() # Writes a snapshot and restarts the log
+    write_states(str(tmp_path), [(7, 7, 7, 7)])
+    points, timestamp = ScoreStore(str(tmp_path), TEAMS).load()
+    assert points == dict(zip(TEAMS, (7, 7, 7, 7)))
+    assert timestamp == 1000.0
+
+
+def test_out_of_range_scores_do_not_stop_the_writer(tmp_path):
+    store = ScoreStore(str(tmp_path), TEAMS)
+    store.load()
+    store.start()
+    assert not store.append(dict(zip(TEAMS, (3000000000, 1, 2, 3))))
+    store.pending.put((1500.0, (3000000000, 1, 2, 3))) # As if it had got past append
+    store.append(dict(zip(TEAMS, (5, 6, 7, 8))), timestamp=1501.0)
+    store.close()
+    assert store.write_errors == 1
+    points, timestamp = ScoreStore(str(tmp_path), TEAMS).load()
+    assert points == dict(zip(TEAMS, (5, 6, 7, 8)))
+    assert timestamp == 1501.0
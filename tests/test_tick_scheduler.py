@@ -0,0 +1,30 @@
+import tk_stub
+from tick_scheduler import TickScheduler
+
+
+def run_for(root, duration_ms):
+    root.after(duration_ms, root.quit)
+    root.mainloop()
+
+
+def test_due_tasks_share_one_wakeup():
+    root = tk_stub.Tk()
+    scheduler = TickScheduler(root)
+    runs = []
+    for name in ("a", "b", "c"): scheduler.call_later(10, lambda name=name: runs.append(name), name=name)
+    run_for(root, 50)
+    assert sorted(runs) == ["a", "b", "c"]
+    assert scheduler.wakeups == 1
+    assert set(scheduler.stats()) == {"a", "b", "c"}
+
+
+def test_cancelled_tasks_do_not_wake_the_loop():
+    root = tk_stub.Tk()
+    scheduler = TickScheduler(root)
+    task = scheduler.call_every(10, lambda: None, name="tick")
+    scheduler.cancel(task)
+    scheduler.call_later(30, lambda: None, name="once")
+    run_for(root, 60)
+    assert scheduler.wakeups <= 2 # The 10 ms wakeup already armed, then the 30 ms one; the periodic task is gone
+    assert scheduler.stats()["once"]["runs"] == 1
+    assert scheduler.stats()["tick"]["runs"] == 0
@@ -0,0 +1,135 @@
+import heapq
+import itertools
+import threading
+import time
+
+# --- Central timer scheduler for the scoreboard display ---
+# Every periodic and one-shot task lives in one heap ordered by deadline, and a single Tk `after` call
+# is kept pending for the earliest deadline, so the interpreter only wakes when some task is actually due.
+# Periodic tasks are paced against absolute deadlines (no drift); a task that falls more than one interval
+# behind is resynchronised rather than run several times in a row, and the skip is counted as a late run.
+
+
+class TaskStats:
+    # Shared by every task scheduled under the same name, so re-armed one-shot timers accumulate together.
+    def __init__(self):
+        self.runs = 0
+        self.late_runs = 0
+        self.run_time_total_s = 0.0
+        self.run_time_max_s = 0.0
+        self.lateness_total_s = 0.0
+        self.lateness_max_s = 0.0
+
+
+class ScheduledTask:
+    def __init__(self, name, callback, deadline, interval_s, stats):
+        self.name = name
+        self.callback = callback
+        self.deadline = deadline
+        self.interval_s = interval_s # None for one-shot tasks; may be changed while the task is scheduled
+        self.cancelled = False
+        self.stats = stats
+
+    def set_interval_ms(self, interval_ms):
+        self.interval_s = interval_ms / 1000.0
+
+
+class TickScheduler:
+    def __init__(self, root):
+        self.root = root
+        self.heap = []
+        self.counter = itertools.count() # Tie-breaker so tasks with equal deadlines never get compared
+        self.after_id = None
+        self.after_deadline = None
+        self.task_stats = {} # name -> TaskStats
+        self.task_stats_lock = threading.Lock() # stats() is also called from the metrics HTTP thread
+        self.wakeups = 0 # Tk `after` callbacks taken; exported as scoreboard_timer_wakeups_total
+
+    def call_later(self, delay_ms, callback, name=None):
+        return self._push(name or callback.__name__, callback, delay_ms, None)
+
+    def call_every(self, interval_ms, callback, name=None, first_delay_ms=None):
+        first_delay_ms = interval_ms if first_delay_ms is None else first_delay_ms
+        return self._push(name or callback.__name__, callback, first_delay_ms, interval_ms / 1000.0)
+
+    def cancel(self, task):
+        # Cancelled tasks stay in the heap and are discarded when they reach the top.
+        if task is not None: task.cancelled = True
+
+    def shutdown(self):
+        for _, _, task in self.heap: task.cancelled = True
+        self.heap = []
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _push(self, name, callback, delay_ms, interval_s):
+        stats = self.task_stats.get(name)
+        if stats is None:
+            with self.task_stats_lock: stats = self.task_stats.setdefault(name, TaskStats())
+        task = ScheduledTask(name, callback, time.monotonic() + delay_ms / 1000.0, interval_s, stats)
+        heapq.heappush(self.heap, (task.deadline, next(self.counter), task))
+        self._arm()
+        return task
+
+    def _arm(self):
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            if self.after_id is not None:
+                self.root.after_cancel(self.after_id)
+                self.after_id = None
+            return
+        deadline = self.heap[0][0]
+        if self.after_id is not None:
+            if self.after_deadline <= deadline: return # Already waking up early enough
+            self.root.after_cancel(self.after_id)
+        self.after_deadline = deadline
+        delay_ms = max(0, int((deadline - time.monotonic()) * 1000 + 0.999)) # Round up so we never wake before the deadline
+        self.after_id = self.root.after(delay_ms, self._run_due)
+
+    def _run_due(self):
+        self.after_id = None
+        self.wakeups += 1
+        now = time.monotonic()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, task = heapq.heappop(self.heap)
+            if task.cancelled: continue
+            lateness_s = now - task.deadline
+            run_start = time.perf_counter()
+            try:
+                task.callback()
+            except Exception as e:
+                print(f"ERROR: Scheduled task '{task.name}' failed: {type(e).__name__} - {e}")
+            run_time_s = time.perf_counter() - run_start
+            stats = task.stats
+            stats.runs += 1
+            stats.run_time_total_s += run_time_s
+            stats.run_time_max_s = max(stats.run_time_max_s, run_time_s)
+            stats.lateness_total_s += lateness_s
+            stats.lateness_max_s = max(stats.lateness_max_s, lateness_s)
+            if task.interval_s is not None and not task.cancelled:
+                task.deadline += task.interval_s
+                if now - task.deadline > task.interval_s:
+                    stats.late_runs += 1
+                    task.deadline = now + task.interval_s
+                heapq.heappush(self.heap, (task.deadline, next(self.counter), task))
+            now = time.monotonic()
+        self._arm()
+
+    def stats(self):
+        # name -> run count, late runs, run time and timer lateness (ms), for jitter and cost analysis.
+        # Safe from any thread: iterates a copy, so the Tk thread can add task names meanwhile.
+        with self.task_stats_lock: task_stats = dict(self.task_stats)
+        result = {}
+        for name, stats in task_stats.items():
+            runs = max(stats.runs, 1)
+            result[name] = {
+                "runs": stats.runs,
+                "late_runs": stats.late_runs,
+                "run_ms_avg": stats.run_time_total_s * 1000 / runs,
+                "run_ms_max": stats.run_time_max_s * 1000,
+                "lateness_ms_avg": stats.lateness_total_s * 1000 / runs,
+                "lateness_ms_max": stats.lateness_max_s * 1000,
+            }
+        return result
@@ -0,0 +1,149 @@
+import heapq
+import itertools
+import selectors
+import time
+from tkinter import TclError # Importing tkinter needs no display; only creating a real Tk() does
+
+from image_cache import read_image_size
+
+# --- Headless stand-in for the parts of tkinter the display uses (benchmark.py --stub-tk) ---
+# Widgets accept every option and method and only count configure calls, so a benchmark measures the
+# display's own Python work (decoding, ranking, deciding what to redraw) without an X server. Drawing
+# cost is not included; use --xvfb for that. The root runs a small event loop with `after` timers and
+# file handlers, which is all the display's scheduler and UDP wakeup need.
+
+BOTH, LEFT, TOP, NONE = "both", "left", "top", "none"
+READABLE = 2
+SCREEN_SIZE = (1920, 1080)
+
+
+class StubEvent:
+    def __init__(self, widget):
+        self.widget = widget
+
+
+class StubWidget:
+    configure_calls = 0 # Across all widgets: how many option changes the display asked for
+    pending_exposes = [] # (widget, callback) for <Expose>/<Map> bindings; the root's mainloop "draws" them
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = dict(options)
+        self.manager = ""
+
+    def configure(self, **options):
+        StubWidget.configure_calls += 1
+        self.options.update(options)
+
+    config = configure
+
+    def pack(self, **options): self.manager = "pack"
+    pack_configure = pack
+    def grid(self, **options): self.manager = "grid"
+    def place(self, **options): self.manager = "place"
+    place_configure = place
+    def pack_forget(self): self.manager = ""
+    def winfo_manager(self): return self.manager
+
+    def bind(self, sequence=None, func=None, add=None):
+        if sequence in ("<Expose>", "<Map>") and func: StubWidget.pending_exposes.append((self, func))
+
+    def unbind(self, sequence, funcid=None):
+        StubWidget.pending_exposes[:] = [(widget, func) for widget, func in StubWidget.pending_exposes if widget is not self]
+
+    def winfo_screenwidth(self): return SCREEN_SIZE[0]
+    def winfo_screenheight(self): return SCREEN_SIZE[1]
+    def destroy(self): self.manager = ""
+
+    def __getattr__(self, name):
+        # bind, lift, attributes, grid_rowconfigure, coords, itemconfigure, ...: accepted and ignored
+        if name.startswith("__"): raise AttributeError(name)
+        return lambda *args, **options: None
+
+
+class Frame(StubWidget): pass
+class Label(StubWidget): pass
+class Button(StubWidget): pass
+class Toplevel(StubWidget): pass
+
+
+class Canvas(StubWidget):
+    item_ids = itertools.count(1)
+
+    def create_line(self, *args, **options): return next(Canvas.item_ids)
+    create_text = create_image = create_line
+
+
+class StringVar:
+    def __init__(self, master=None, value=""):
+        self.value = value
+
+    def get(self): return self.value
+    def set(self, value): self.value = value
+
+
+class PhotoImage:
+    def __init__(self, master=None, file=None, size=None):
+        self.size = size or (read_image_size(file) if file else None) or (100, 100)
+
+    def width(self): return self.size[0]
+    def height(self): return self.size[1]
+    def zoom(self, x, y=None): return PhotoImage(size=(self.size[0] * x, self.size[1] * (y or x)))
+    def subsample(self, x, y=None): return PhotoImage(size=(max(self.size[0] // x, 1), max(self.size[1] // (y or x), 1)))
+    def write(self, path, format=None): raise TclError("stub images cannot be written")
+
+
+class StubInterpreter:
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+
+    def createfilehandler(self, fd, mask, callback):
+        self.selector.register(fd, selectors.EVENT_READ, callback)
+
+    def deletefilehandler(self, fd):
+        try: self.selector.unregister(fd)
+        except (KeyError, ValueError): pass
+
+
+class Tk(StubWidget):
+    def __init__(self):
+        super().__init__()
+        self.tk = StubInterpreter()
+        self.timers = [] # (deadline, id, callback, args)
+        self.timer_ids = itertools.count(1)
+        self.cancelled = set()
+        self.running = False
+
+    def after(self, delay_ms, callback=None, *args):
+        timer_id = next(self.timer_ids)
+        heapq.heappush(self.timers, (time.monotonic() + delay_ms / 1000.0, timer_id, callback, args))
+        return timer_id
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def mainloop(self):
+        self.running = True
+        while self.running:
+            while StubWidget.pending_exposes: # Widgets are "on screen" once the loop runs
+                widget, callback = StubWidget.pending_exposes.pop(0)
+                callback(StubEvent(widget))
+            timeout = max(self.timers[0][0] - time.monotonic(), 0) if self.timers else 1.0
+            if self.tk.selector.get_map():
+                for key, _ in self.tk.selector.select(timeout): key.data(key.fd, READABLE)
+            else:
+                time.sleep(timeout)
+            while self.running and self.timers and self.timers[0][0] <= time.monotonic():
+                _, timer_id, callback, args = heapq.heappop(self.timers)
+                if timer_id in self.cancelled: self.cancelled.discard(timer_id)
+                else: callback(*args)
+
+    def quit(self):
+        self.running = False
+
+    def destroy(self):
+        self.running = False
+        self.tk.selector.close()